@@ -28,6 +28,7 @@ from .canvas_api import (
     update_calendar_event,
     delete_calendar_event,
     test_token_permissions,
+    ParsedAssignment,
     CanvasAPIError,
     TokenInvalidError,
     RateLimitError
@@ -68,6 +69,7 @@ __all__ = [
     'update_calendar_event',
     'delete_calendar_event',
     'test_token_permissions',
+    'ParsedAssignment',
     'CanvasAPIError',
     'TokenInvalidError',
     'RateLimitError',
@@ -5,11 +5,41 @@ This module handles all communication with the Canvas LMS API.
 It manages authentication, data fetching, data creation, and response parsing.
 """
 
+import functools
+import json
 import requests
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import sys
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterable, Iterator
 from datetime import datetime, timezone
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from operator import itemgetter
+from urllib.parse import urlsplit, parse_qs
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
+
+# orjson parses Canvas' large list responses several times faster than the
+# stdlib; both accept the raw response bytes
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+# ijson lets assignment listings be parsed item by item straight off the
+# socket, so filtered-out assignments are never held as a whole list
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -18,6 +48,186 @@ logger = logging.getLogger(__name__)
 CANVAS_API_BASE = None
 
 
+def _create_session() -> requests.Session:
+    """
+    Create the HTTP session shared by all Canvas requests.
+    
+    The session keeps TLS connections alive between calls and retries
+    transient failures. Retries that run out hand back the last response so
+    the status handling in _make_canvas_request still applies. Rate limit
+    responses (429) are handled there as well, using Retry-After.
+    
+    Returns:
+        requests.Session: Configured session
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[500, 502, 503, 504],
+        raise_on_status=False
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retry))
+    return session
+
+
+# Shared HTTP session - one connection pool for the whole process
+_SESSION = _create_session()
+
+# Client-side rate limit shared by every thread making Canvas requests
+CANVAS_REQUESTS_PER_SECOND = 10
+CANVAS_REQUEST_BURST = 10
+
+# How many times a rate-limited (429) request is retried before giving up
+RATE_LIMIT_MAX_RETRIES = 3
+
+# Maximum number of pages of one paginated listing fetched at the same time
+CANVAS_PAGE_WORKERS = 4
+
+# Canvas REST endpoints; the per-ID ones are bound str.format templates
+_USER_SELF_ENDPOINT = "/api/v1/users/self"
+_COURSES_ENDPOINT = "/api/v1/courses"
+_ASSIGNMENTS_ENDPOINT = "/api/v1/courses/{}/assignments".format
+_CALENDAR_EVENTS_ENDPOINT = "/api/v1/calendar_events"
+_CALENDAR_EVENT_ENDPOINT = "/api/v1/calendar_events/{}".format
+
+
+class _TokenBucket:
+    """Thread-safe token bucket that paces requests to a steady rate"""
+    
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                wait = (1 - self._tokens) / self.rate
+            
+            time.sleep(wait)
+
+
+_RATE_LIMITER = _TokenBucket(CANVAS_REQUESTS_PER_SECOND, CANVAS_REQUEST_BURST)
+
+
+class _TTLCache:
+    """Thread-safe dictionary cache whose entries expire after a fixed time"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Any, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any) -> Any:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            return entry[1]
+    
+    def set(self, key: Any, value: Any) -> None:
+        """Store a value, evicting the oldest entry when full."""
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                self._data.pop(next(iter(self._data)))
+            self._data[key] = (time.monotonic() + self.ttl, value)
+    
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._data.clear()
+
+
+# Successful token validations and course lists, keyed by (token, base URL).
+# Errors are never cached so a retry always goes back to Canvas.
+_TOKEN_CACHE = _TTLCache(maxsize=10_000, ttl=300)
+_COURSES_CACHE = _TTLCache(maxsize=10_000, ttl=600)
+
+
+def _clear_caches() -> None:
+    """Empty the response caches (used by tests)."""
+    _TOKEN_CACHE.clear()
+    _COURSES_CACHE.clear()
+
+
+def _retry_after_seconds(response: requests.Response, attempt: int) -> float:
+    """
+    Work out how long to wait after a 429 response.
+    
+    Args:
+        response (requests.Response): The rate-limited response
+        attempt (int): Zero-based retry attempt number
+        
+    Returns:
+        float: Seconds to wait, from Retry-After or exponential backoff
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return float(2 ** attempt)
+
+
+# Returned by the *_if_changed fetchers when Canvas answers 304 Not Modified
+UNCHANGED = object()
+
+# Errors a fetcher can hit after _make_canvas_request succeeded: transport
+# failures while streaming the body, and malformed or unexpected payloads
+_RESPONSE_ERRORS = (
+    requests.exceptions.RequestException,
+    Urllib3HTTPError,
+    ValueError,
+    KeyError,
+    TypeError,
+    AttributeError
+) + ((ijson.JSONError,) if ijson is not None else ())
+
+# Course workflow states that count as active
+_ACTIVE_COURSE_STATES = frozenset({"available"})
+
+# Fields every usable assignment must have, fetched in one C-level call
+_ASSIGNMENT_FIELDS = itemgetter("id", "due_at", "workflow_state")
+
+# Source tags shared by every parsed record
+_SOURCE_CANVAS_ASSIGNMENT = sys.intern("canvas_assignment")
+_SOURCE_CANVAS_EVENT = sys.intern("canvas_event")
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedAssignment:
+    """A published Canvas assignment with a due date, as returned by the fetchers"""
+    canvas_assignment_id: int
+    title: str
+    due_date: datetime
+    course_id: int
+    course_name: str
+    course_code: str
+    points_possible: float
+    submission_types: List[str]
+    html_url: Optional[str]
+    is_submitted: bool
+    source: str = _SOURCE_CANVAS_ASSIGNMENT
+
+
 class CanvasAPIError(Exception):
     """Custom exception for Canvas API errors"""
     pass
@@ -57,7 +267,7 @@ def _get_canvas_domain_from_token(token: str) -> Optional[str]:
             url = f"https://{domain}/api/v1/users/self"
             headers = {"Authorization": f"Bearer {token}"}
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = _SESSION.get(url, headers=headers, timeout=10)
             if response.status_code == 200:
                 logger.info(f"Successfully identified Canvas domain: {domain}")
                 return domain
@@ -69,7 +279,8 @@ def _get_canvas_domain_from_token(token: str) -> Optional[str]:
 
 
 def _make_canvas_request(endpoint: str, token: str, method: str = "GET", 
-                        data: Optional[Dict] = None, params: Optional[Dict] = None) -> requests.Response:
+                        data: Optional[Dict] = None, params: Optional[Dict] = None,
+                        headers: Optional[Dict] = None, stream: bool = False) -> requests.Response:
     """
     Make an authenticated request to the Canvas API.
     
@@ -79,6 +290,8 @@ def _make_canvas_request(endpoint: str, token: str, method: str = "GET",
         method (str): HTTP method (GET, POST, PUT, DELETE)
         data (Optional[Dict]): Request body data for POST/PUT requests
         params (Optional[Dict]): URL parameters
+        headers (Optional[Dict]): Extra request headers (e.g., If-None-Match)
+        stream (bool): Leave the body unread so it can be parsed incrementally
         
     Returns:
         requests.Response: The response object
@@ -98,22 +311,38 @@ def _make_canvas_request(endpoint: str, token: str, method: str = "GET",
         CANVAS_API_BASE = f"https://{domain}"
     
     url = f"{CANVAS_API_BASE}{endpoint}"
-    headers = {"Authorization": f"Bearer {token}"}
+    headers = {**(headers or {}), "Authorization": f"Bearer {token}"}
+    
+    # Serialize the body once, outside the retry loop
+    body = None
+    if data:
+        body = _json_dumps(data)
+        headers["Content-Type"] = "application/json"
     
     try:
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=headers,
-            json=data if data else None,
-            params=params,
-            timeout=30
-        )
-        
-        # Handle rate limiting
-        if response.status_code == 429:
-            logger.warning("Canvas API rate limit exceeded")
-            raise RateLimitError("Canvas API rate limit exceeded")
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            _RATE_LIMITER.acquire()
+            response = _SESSION.request(
+                method=method,
+                url=url,
+                headers=headers,
+                data=body,
+                params=params,
+                timeout=30,
+                stream=stream
+            )
+            
+            if response.status_code != 429:
+                break
+            
+            # Handle rate limiting
+            if attempt == RATE_LIMIT_MAX_RETRIES:
+                logger.warning("Canvas API rate limit exceeded")
+                raise RateLimitError("Canvas API rate limit exceeded")
+            
+            delay = _retry_after_seconds(response, attempt)
+            logger.warning(f"Canvas API rate limited, retrying in {delay:.1f}s")
+            time.sleep(delay)
         
         # Handle authentication errors
         if response.status_code == 401:
@@ -128,15 +357,121 @@ def _make_canvas_request(endpoint: str, token: str, method: str = "GET",
         
         return response
         
-    except requests.exceptions.Timeout:
+    except requests.exceptions.Timeout as e:
         logger.error("Timeout connecting to Canvas API")
-        raise CanvasAPIError("Timeout connecting to Canvas API")
-    except requests.exceptions.ConnectionError:
+        raise CanvasAPIError("Canvas API error: timeout connecting to Canvas") from e
+    except requests.exceptions.ConnectionError as e:
         logger.error("Connection error to Canvas API")
-        raise CanvasAPIError("Connection error to Canvas API")
+        raise CanvasAPIError("Canvas API error: could not connect to Canvas") from e
     except requests.exceptions.RequestException as e:
         logger.error(f"Unexpected error connecting to Canvas API: {e}")
-        raise CanvasAPIError(f"Unexpected error: {e}")
+        raise CanvasAPIError(f"Canvas API error: {e}") from e
+
+
+def _page_number(url: Optional[str]) -> Optional[int]:
+    """
+    Get the numeric page parameter from a Canvas pagination link.
+    
+    Args:
+        url (Optional[str]): Link URL from the response's Link header
+        
+    Returns:
+        Optional[int]: Page number, or None if the link uses opaque bookmarks
+    """
+    if not url:
+        return None
+    page = parse_qs(urlsplit(url).query).get("page", [None])[0]
+    return int(page) if page and page.isdigit() else None
+
+
+def _is_single_page(response: requests.Response) -> bool:
+    """
+    Check whether a listing response holds the whole listing.
+    
+    A 304 only vouches for the page it answered, so a conditional fetch may
+    treat a listing as unchanged (and keep its ETag) only when it has no
+    further pages.
+    
+    Args:
+        response (requests.Response): Response for the listing's first page
+        
+    Returns:
+        bool: True if the Link header points to no page after this one
+    """
+    links = response.links
+    return "next" not in links and (_page_number(links.get("last", {}).get("url")) or 1) <= 1
+
+
+def _read_items(response: requests.Response, stream: bool) -> Iterable[Dict[str, Any]]:
+    """
+    Get the items of a JSON array response.
+    
+    Args:
+        response (requests.Response): Response whose body is a JSON array
+        stream (bool): Whether the request was made with stream=True
+        
+    Returns:
+        Iterable[Dict]: The array items; lazily parsed when streaming with ijson
+    """
+    if stream and ijson is not None:
+        response.raw.decode_content = True
+        return ijson.items(response.raw, "item", use_float=True)
+    return _json_loads(response.content)
+
+
+def _collect_pages(response: requests.Response, endpoint: str, token: str,
+                   params: Optional[Dict] = None,
+                   parse: Callable[[Iterable[Dict[str, Any]]], List[Any]] = list,
+                   stream: bool = False) -> List[Any]:
+    """
+    Collect every item of a paginated Canvas listing, starting from its first page.
+    
+    When the Link header's "last" URL carries a page number, the remaining
+    pages are requested concurrently. Otherwise (bookmark pagination) the
+    "next" links are followed one at a time.
+    
+    Args:
+        response (requests.Response): Response for the first page
+        endpoint (str): API endpoint the listing came from
+        token (str): Canvas API token
+        params (Optional[Dict]): URL parameters used for the first page
+        parse (Callable): Turns one page's items into the results to keep
+        stream (bool): Whether the first page was requested with stream=True;
+            the remaining pages are requested the same way
+        
+    Returns:
+        List: Parsed results from all pages, in page order
+    """
+    def parse_page(page_response: requests.Response) -> List[Any]:
+        try:
+            return parse(_read_items(page_response, stream))
+        finally:
+            page_response.close()
+    
+    links = response.links
+    items = parse_page(response)
+    last_page = _page_number(links.get("last", {}).get("url"))
+    
+    if last_page and last_page > 1:
+        def fetch_page(page: int) -> List[Any]:
+            return parse_page(_make_canvas_request(
+                endpoint, token, params={**(params or {}), "page": page}, stream=stream
+            ))
+        
+        pages = range(2, last_page + 1)
+        with ThreadPoolExecutor(max_workers=min(CANVAS_PAGE_WORKERS, len(pages))) as executor:
+            for page_items in executor.map(fetch_page, pages):
+                items.extend(page_items)
+        return items
+    
+    next_url = links.get("next", {}).get("url")
+    while next_url:
+        parts = urlsplit(next_url)
+        response = _make_canvas_request(f"{parts.path}?{parts.query}", token, stream=stream)
+        next_url = response.links.get("next", {}).get("url")
+        items.extend(parse_page(response))
+    
+    return items
 
 
 def validate_token(token: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
@@ -150,9 +485,14 @@ def validate_token(token: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
         Tuple[bool, Optional[Dict]]: (is_valid, user_info)
         user_info contains id, name, email if valid
     """
+    cache_key = (token, CANVAS_API_BASE)
+    cached = _TOKEN_CACHE.get(cache_key)
+    if cached is not None:
+        return True, dict(cached)
+    
     try:
-        response = _make_canvas_request("/api/v1/users/self", token)
-        user_data = response.json()
+        response = _make_canvas_request(_USER_SELF_ENDPOINT, token)
+        user_data = _json_loads(response.content)
         
         # Extract essential user information
         user_info = {
@@ -163,17 +503,163 @@ def validate_token(token: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
         }
         
         logger.info(f"Token validated successfully for user: {user_info['name']}")
-        return True, user_info
+        _TOKEN_CACHE.set((token, CANVAS_API_BASE), user_info)
+        return True, dict(user_info)
         
     except (TokenInvalidError, CanvasAPIError) as e:
         logger.error(f"Token validation failed: {e}")
         return False, None
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_iso(value: Optional[str]) -> Optional[datetime]:
+    """
+    Parse a Canvas ISO-8601 timestamp.
+    
+    Cached because the same due dates (end of week, end of term) repeat
+    across many assignments and users.
+    
+    Args:
+        value (Optional[str]): Timestamp such as "2024-12-15T23:59:00Z"
+        
+    Returns:
+        Optional[datetime]: Timezone-aware datetime, or None if missing or malformed
+    """
+    if not value:
+        return None
+    try:
+        # Canvas almost always sends the fixed 20-character "YYYY-MM-DDTHH:MM:SSZ"
+        # form, which can be sliced directly
+        if len(value) == 20 and value[19] == 'Z' and value[4] + value[7] + value[10] + value[13] + value[16] == '--T::':
+            return datetime(
+                int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                tzinfo=timezone.utc
+            )
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+def _fmt_iso_z(dt: datetime) -> str:
+    """
+    Format a datetime as a Canvas-style UTC timestamp ("YYYY-MM-DDTHH:MM:SSZ").
+    
+    Naive datetimes are taken to be UTC already.
+    
+    Args:
+        dt (datetime): Datetime to format
+        
+    Returns:
+        str: Timestamp string with seconds precision
+    """
+    if dt.tzinfo is not None and dt.tzinfo is not timezone.utc:
+        dt = dt.astimezone(timezone.utc)
+    return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}T{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}Z"
+
+
+def _parse_courses(courses_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Parse raw Canvas course data into course dictionaries.
+    
+    Args:
+        courses_data (List[Dict]): Courses as returned by the Canvas API
+        
+    Returns:
+        List[Dict]: Available courses with id, name, code
+    """
+    # Skip courses that are not published or accessible
+    return [
+        {
+            "id": course.get("id"),
+            "name": course.get("name", "Unnamed Course"),
+            "course_code": course.get("course_code", ""),
+            "term": (course.get("term") or {}).get("name", ""),
+            "start_at": course.get("start_at"),
+            "end_at": course.get("end_at")
+        }
+        for course in courses_data
+        if course.get("workflow_state") in _ACTIVE_COURSE_STATES
+    ]
+
+
+def _parse_assignments(course: Dict[str, Any], assignments_data: Iterable[Dict[str, Any]]) -> List[ParsedAssignment]:
+    """
+    Parse raw Canvas assignment data for one course into assignment records.
+    
+    Args:
+        course (Dict): Parsed course the assignments belong to
+        assignments_data (Iterable[Dict]): Assignments as returned by the Canvas API
+        
+    Returns:
+        List[ParsedAssignment]: Published assignments that have a due date
+    """
+    # The course fields are the same for every assignment, so read them once
+    course_id, course_name, course_code = course["id"], course["name"], course["course_code"]
+    
+    assignments = []
+    append = assignments.append
+    for assignment in assignments_data:
+        # Skip assignments without due dates or that are not published
+        try:
+            assignment_id, due_at, workflow_state = _ASSIGNMENT_FIELDS(assignment)
+        except KeyError:
+            continue
+        if not due_at or workflow_state != "published":
+            continue
+        
+        # Parse due date
+        due_date = _parse_iso(due_at)
+        if due_date is None:
+            logger.warning(f"Could not parse due date: {due_at}")
+            continue
+        
+        # Check if assignment is already submitted (Canvas may send null)
+        submission = assignment.get("submission") or {}
+        
+        append(ParsedAssignment(
+            assignment_id,
+            assignment.get("name", "Untitled Assignment"),
+            due_date,
+            course_id,
+            course_name,
+            course_code,
+            assignment.get("points_possible", 0),
+            assignment.get("submission_types", []),
+            assignment.get("html_url"),
+            submission.get("workflow_state") == "submitted"
+        ))
+    
+    return assignments
+
+
 def get_courses(token: str) -> List[Dict[str, Any]]:
     """
     Fetch all active courses for a user.
     
+    Args:
+        token (str): Canvas API token
+        
+    Returns:
+        List[Dict]: List of course dictionaries with id, name, code
+        
+    Raises:
+        TokenInvalidError: If token is invalid
+        CanvasAPIError: For other API errors
+    """
+    cached = _COURSES_CACHE.get((token, CANVAS_API_BASE))
+    if cached is not None:
+        return list(cached)
+    
+    return list(_fetch_courses(token))
+
+
+def _fetch_courses(token: str) -> List[Dict[str, Any]]:
+    """
+    Fetch all active courses for a user from Canvas, bypassing the cache.
+    
+    The result is stored in the course cache for later get_courses calls.
+    
     Args:
         token (str): Canvas API token
         
@@ -192,37 +678,19 @@ def get_courses(token: str) -> List[Dict[str, Any]]:
             "include": ["term"]
         }
         
-        response = _make_canvas_request("/api/v1/courses", token, params=params)
-        courses_data = response.json()
-        
-        # Parse and clean course data
-        courses = []
-        for course in courses_data:
-            # Skip courses that are not published or accessible
-            if not course.get("workflow_state") == "available":
-                continue
-                
-            course_info = {
-                "id": course.get("id"),
-                "name": course.get("name", "Unnamed Course"),
-                "course_code": course.get("course_code", ""),
-                "term": course.get("term", {}).get("name", ""),
-                "start_at": course.get("start_at"),
-                "end_at": course.get("end_at")
-            }
-            courses.append(course_info)
+        response = _make_canvas_request(_COURSES_ENDPOINT, token, params=params)
+        courses = _parse_courses(_collect_pages(response, _COURSES_ENDPOINT, token, params))
         
         logger.info(f"Retrieved {len(courses)} active courses")
+        _COURSES_CACHE.set((token, CANVAS_API_BASE), courses)
         return courses
         
-    except (TokenInvalidError, RateLimitError):
-        raise  # Re-raise these specific exceptions
-    except Exception as e:
+    except _RESPONSE_ERRORS as e:
         logger.error(f"Error fetching courses: {e}")
-        raise CanvasAPIError(f"Error fetching courses: {e}")
+        raise CanvasAPIError(f"Error fetching courses: {e}") from e
 
 
-def get_assignments(token: str) -> List[Dict[str, Any]]:
+def get_assignments(token: str) -> List[ParsedAssignment]:
     """
     Fetch all upcoming assignments across all courses.
     
@@ -230,7 +698,7 @@ def get_assignments(token: str) -> List[Dict[str, Any]]:
         token (str): Canvas API token
         
     Returns:
-        List[Dict]: List of assignment dictionaries with essential info
+        List[ParsedAssignment]: Assignments sorted by due date
         
     Raises:
         TokenInvalidError: If token is invalid
@@ -253,63 +721,370 @@ def get_assignments(token: str) -> List[Dict[str, Any]]:
             }
             
             try:
-                response = _make_canvas_request(
-                    f"/api/v1/courses/{course_id}/assignments", 
-                    token, 
-                    params=params
-                )
-                assignments_data = response.json()
-                
-                for assignment in assignments_data:
-                    # Skip assignments without due dates or that are not published
-                    if not assignment.get("due_at") or assignment.get("workflow_state") != "published":
-                        continue
-                    
-                    # Parse due date
-                    due_date = None
-                    due_at_str = assignment.get("due_at")
-                    if due_at_str:
-                        try:
-                            due_date = datetime.fromisoformat(due_at_str.replace('Z', '+00:00'))
-                        except ValueError:
-                            logger.warning(f"Could not parse due date: {due_at_str}")
-                            continue
-                    
-                    # Check if assignment is already submitted
-                    submission = assignment.get("submission", {})
-                    is_submitted = submission.get("workflow_state") == "submitted"
-                    
-                    assignment_info = {
-                        "id": assignment.get("id"),
-                        "title": assignment.get("name", "Untitled Assignment"),
-                        "due_date": due_date,
-                        "course_id": course_id,
-                        "course_name": course["name"],
-                        "course_code": course["course_code"],
-                        "points_possible": assignment.get("points_possible", 0),
-                        "submission_types": assignment.get("submission_types", []),
-                        "html_url": assignment.get("html_url"),
-                        "is_submitted": is_submitted,
-                        "source": "canvas_assignment"
-                    }
-                    
-                    all_assignments.append(assignment_info)
+                endpoint = _ASSIGNMENTS_ENDPOINT(course_id)
+                response = _make_canvas_request(endpoint, token, params=params, stream=True)
+                all_assignments.extend(_collect_pages(
+                    response, endpoint, token, params,
+                    parse=functools.partial(_parse_assignments, course), stream=True
+                ))
                     
             except CanvasAPIError as e:
                 logger.warning(f"Could not fetch assignments for course {course_id}: {e}")
                 continue  # Skip this course and continue with others
         
         # Sort assignments by due date
-        all_assignments.sort(key=lambda x: x["due_date"] or datetime.max.replace(tzinfo=timezone.utc))
+        all_assignments.sort(key=lambda x: x.due_date)
         
         logger.info(f"Retrieved {len(all_assignments)} assignments across {len(courses)} courses")
         return all_assignments
         
-    except (TokenInvalidError, RateLimitError):
-        raise  # Re-raise these specific exceptions
-    except Exception as e:
+    except _RESPONSE_ERRORS as e:
+        logger.error(f"Error fetching assignments: {e}")
+        raise CanvasAPIError(f"Error fetching assignments: {e}") from e
+
+
+def get_courses_if_changed(token: str, etag: Optional[str] = None) -> Tuple[Any, Optional[str]]:
+    """
+    Fetch active courses unless they are unchanged since the given ETag.
+    
+    An ETag is only returned when the course list fits on one page, since a
+    304 for the first page says nothing about the pages after it.
+    
+    Args:
+        token (str): Canvas API token
+        etag (Optional[str]): ETag from the previous course fetch
+        
+    Returns:
+        Tuple[Any, Optional[str]]: (courses or UNCHANGED, ETag to store)
+        
+    Raises:
+        TokenInvalidError: If token is invalid
+        CanvasAPIError: For other API errors
+    """
+    try:
+        params = {
+            "enrollment_state": "active",
+            "per_page": 100,
+            "include": ["term"]
+        }
+        headers = {"If-None-Match": etag} if etag else None
+        
+        response = _make_canvas_request(_COURSES_ENDPOINT, token, params=params, headers=headers)
+        if response.status_code == 304:
+            response.close()
+            if _is_single_page(response):
+                logger.debug("Courses unchanged since last fetch")
+                return UNCHANGED, etag
+            response = _make_canvas_request(_COURSES_ENDPOINT, token, params=params)
+        
+        single_page = _is_single_page(response)
+        courses = _parse_courses(_collect_pages(response, _COURSES_ENDPOINT, token, params))
+        logger.info(f"Retrieved {len(courses)} active courses")
+        return courses, (response.headers.get("ETag") if single_page else None)
+        
+    except _RESPONSE_ERRORS as e:
+        logger.error(f"Error fetching courses: {e}")
+        raise CanvasAPIError(f"Error fetching courses: {e}") from e
+
+
+def get_assignments_if_changed(token: str, etags: Optional[Dict[str, str]] = None) -> Tuple[Any, Dict[str, str]]:
+    """
+    Fetch all assignments unless no course's assignments changed since the given ETags.
+    
+    Each course's assignment list is requested with If-None-Match. If every
+    course answers 304 and the set of courses is the same, UNCHANGED is
+    returned. Otherwise the courses that answered 304 are fetched again so
+    the caller always gets the complete list. ETags are only kept for
+    courses whose assignments fit on one page, and the course list itself
+    is fetched fresh rather than from the course cache.
+    
+    Args:
+        token (str): Canvas API token
+        etags (Optional[Dict[str, str]]): Course ID -> ETag from the previous fetch
+        
+    Returns:
+        Tuple[Any, Dict[str, str]]: (assignments or UNCHANGED, ETags to store)
+        
+    Raises:
+        TokenInvalidError: If token is invalid
+        CanvasAPIError: For other API errors
+    """
+    etags = etags or {}
+    params = {
+        "per_page": 100,
+        "include": ["submission"],
+        "order_by": "due_at"
+    }
+    
+    try:
+        # A cached course list could hide a newly added course
+        courses = _fetch_courses(token)
+        
+        all_assignments = []
+        new_etags = {}
+        unchanged_courses = []
+        refetch_courses = []
+        
+        for course in courses:
+            course_id = str(course["id"])
+            headers = {"If-None-Match": etags[course_id]} if course_id in etags else None
+            
+            endpoint = _ASSIGNMENTS_ENDPOINT(course_id)
+            try:
+                response = _make_canvas_request(endpoint, token, params=params, headers=headers, stream=True)
+                
+                if response.status_code == 304:
+                    response.close()
+                    if _is_single_page(response):
+                        unchanged_courses.append(course)
+                        new_etags[course_id] = etags[course_id]
+                    else:
+                        # Later pages may have changed, so fetch the course again
+                        refetch_courses.append(course)
+                    continue
+                
+                single_page = _is_single_page(response)
+                all_assignments.extend(_collect_pages(
+                    response, endpoint, token, params,
+                    parse=functools.partial(_parse_assignments, course), stream=True
+                ))
+            except CanvasAPIError as e:
+                logger.warning(f"Could not fetch assignments for course {course_id}: {e}")
+                continue  # Skip this course and continue with others
+            
+            if single_page and response.headers.get("ETag"):
+                new_etags[course_id] = response.headers["ETag"]
+        
+        if len(unchanged_courses) == len(courses) and set(new_etags) == set(etags):
+            logger.debug("Assignments unchanged since last fetch")
+            return UNCHANGED, new_etags
+        
+        # Something changed, so fill in the courses that answered 304
+        for course in unchanged_courses + refetch_courses:
+            course_id = str(course["id"])
+            endpoint = _ASSIGNMENTS_ENDPOINT(course_id)
+            try:
+                response = _make_canvas_request(endpoint, token, params=params, stream=True)
+                single_page = _is_single_page(response)
+                all_assignments.extend(_collect_pages(
+                    response, endpoint, token, params,
+                    parse=functools.partial(_parse_assignments, course), stream=True
+                ))
+            except CanvasAPIError as e:
+                logger.warning(f"Could not fetch assignments for course {course_id}: {e}")
+                new_etags.pop(course_id, None)
+                continue
+            
+            new_etags.pop(course_id, None)
+            if single_page and response.headers.get("ETag"):
+                new_etags[course_id] = response.headers["ETag"]
+        
+        # Sort assignments by due date
+        all_assignments.sort(key=lambda x: x.due_date)
+        
+        logger.info(f"Retrieved {len(all_assignments)} assignments across {len(courses)} courses")
+        return all_assignments, new_etags
+        
+    except _RESPONSE_ERRORS as e:
         logger.error(f"Error fetching assignments: {e}")
-        raise CanvasAPIError(f"Error fetching assignments: {e}")
+        raise CanvasAPIError(f"Error fetching assignments: {e}") from e
+
+
+# Assignments requested per page of a course's assignmentsConnection
+GRAPHQL_ASSIGNMENTS_PAGE_SIZE = 100
+
+# Assignment fields shared by both queries; submissionsConnection holds the
+# requesting student's own submission
+_GRAPHQL_ASSIGNMENTS_CONNECTION = """
+    assignmentsConnection(first: $pageSize, after: $after) {
+      nodes {
+        _id name dueAt state pointsPossible htmlUrl submissionTypes
+        submissionsConnection(first: 1) { nodes { state } }
+      }
+      pageInfo { hasNextPage endCursor }
+    }
+"""
+
+# One GraphQL query returning a user's courses with the first page of their assignments
+COURSES_AND_ASSIGNMENTS_QUERY = """
+query CoursesAndAssignments($pageSize: Int, $after: String) {
+  allCourses {
+    _id
+    name
+    courseCode
+    state
+    term { name startAt endAt }
+    %s
+  }
+}
+""" % _GRAPHQL_ASSIGNMENTS_CONNECTION
+
+# Follow-up query for the remaining assignment pages of one course
+COURSE_ASSIGNMENTS_PAGE_QUERY = """
+query CourseAssignmentsPage($courseId: ID!, $pageSize: Int, $after: String) {
+  course(id: $courseId) {
+    %s
+  }
+}
+""" % _GRAPHQL_ASSIGNMENTS_CONNECTION
+
+
+def canvas_graphql(token: str, query: str, variables: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Run a query against the Canvas GraphQL endpoint.
+    
+    Args:
+        token (str): Canvas API token
+        query (str): GraphQL query document
+        variables (Optional[Dict]): Query variables
+        
+    Returns:
+        Dict: The "data" member of the GraphQL response
+        
+    Raises:
+        TokenInvalidError: If token is invalid
+        CanvasAPIError: For API errors or GraphQL errors in the response
+    """
+    response = _make_canvas_request(
+        "/api/graphql",
+        token,
+        method="POST",
+        data={"query": query, "variables": variables or {}}
+    )
+    payload = _json_loads(response.content)
+    
+    if payload.get("errors"):
+        raise CanvasAPIError(f"Canvas GraphQL error: {payload['errors']}")
+    
+    return payload.get("data") or {}
+
+
+def _graphql_assignment_nodes(token: str, course_id: str, connection: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every assignment node of a course, following the connection cursor.
+    
+    Args:
+        token (str): Canvas API token
+        course_id (str): Canvas course ID (GraphQL _id)
+        connection (Dict): First page of the course's assignmentsConnection
+        
+    Yields:
+        Dict: Assignment nodes, page by page
+    """
+    while connection:
+        yield from connection.get("nodes") or []
+        
+        page_info = connection.get("pageInfo") or {}
+        if not page_info.get("hasNextPage"):
+            return
+        
+        data = canvas_graphql(token, COURSE_ASSIGNMENTS_PAGE_QUERY, {
+            "courseId": course_id,
+            "pageSize": GRAPHQL_ASSIGNMENTS_PAGE_SIZE,
+            "after": page_info["endCursor"]
+        })
+        connection = (data.get("course") or {}).get("assignmentsConnection")
+
+
+def _graphql_submission(node: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Map the student's GraphQL submission onto the REST "submission" field.
+    
+    Args:
+        node (Dict): GraphQL assignment node
+        
+    Returns:
+        Optional[Dict]: {"workflow_state": state}, or None without a submission
+    """
+    submissions = (node.get("submissionsConnection") or {}).get("nodes") or []
+    return {"workflow_state": submissions[0].get("state")} if submissions else None
+
+
+def get_courses_and_assignments(token: str) -> Tuple[List[Dict[str, Any]], List[ParsedAssignment]]:
+    """
+    Fetch active courses and their assignments through the GraphQL API.
+    
+    One request returns the courses with the first page of each course's
+    assignments; courses with more assignments are paged through with their
+    connection cursor, so the list is never truncated. GraphQL nodes are
+    mapped onto the REST field names (including the submission state) so
+    the same parsing as get_courses/get_assignments applies.
+    
+    Args:
+        token (str): Canvas API token
+        
+    Returns:
+        Tuple[List[Dict], List[ParsedAssignment]]: (courses, assignments)
+        
+    Raises:
+        TokenInvalidError: If token is invalid
+        CanvasAPIError: For other API errors
+    """
+    try:
+        data = canvas_graphql(token, COURSES_AND_ASSIGNMENTS_QUERY,
+                              {"pageSize": GRAPHQL_ASSIGNMENTS_PAGE_SIZE})
+        
+        courses = []
+        all_assignments = []
+        
+        for node in data.get("allCourses") or []:
+            term = node.get("term") or {}
+            parsed = _parse_courses([{
+                "id": int(node["_id"]),
+                "name": node.get("name"),
+                "course_code": node.get("courseCode"),
+                "workflow_state": node.get("state"),
+                "term": {"name": term.get("name", "")},
+                "start_at": term.get("startAt"),
+                "end_at": term.get("endAt")
+            }])
+            if not parsed:
+                continue
+            
+            course = parsed[0]
+            courses.append(course)
+            
+            # Map and filter in one pass: the generator feeds each mapped node
+            # straight into the parser without building an intermediate list
+            assignment_nodes = _graphql_assignment_nodes(token, node["_id"], node.get("assignmentsConnection"))
+            all_assignments.extend(_parse_assignments(course, (
+                {
+                    "id": int(a["_id"]),
+                    "name": a.get("name"),
+                    "due_at": a.get("dueAt"),
+                    "workflow_state": a.get("state"),
+                    "points_possible": a.get("pointsPossible"),
+                    "html_url": a.get("htmlUrl"),
+                    "submission_types": a.get("submissionTypes") or [],
+                    "submission": _graphql_submission(a)
+                }
+                for a in assignment_nodes
+                if a.get("dueAt")
+            )))
+        
+        # Sort assignments by due date
+        all_assignments.sort(key=lambda x: x.due_date)
+        
+        logger.info(f"Retrieved {len(all_assignments)} assignments across {len(courses)} courses via GraphQL")
+        return courses, all_assignments
+        
+    except _RESPONSE_ERRORS as e:
+        logger.error(f"Error fetching courses and assignments via GraphQL: {e}")
+        raise CanvasAPIError(f"Error fetching courses and assignments via GraphQL: {e}") from e
+
+
+@functools.lru_cache(maxsize=1024)
+def _course_context(course_id: int) -> str:
+    """
+    Get the Canvas context code for a course (e.g., "course_1001").
+    
+    Args:
+        course_id (int): Canvas course ID
+        
+    Returns:
+        str: Context code, shared between events for the same course
+    """
+    return f"course_{course_id}"
 
 
 def get_calendar_events(token: str, start_date: Optional[datetime] = None, 
@@ -337,55 +1112,42 @@ def get_calendar_events(token: str, start_date: Optional[datetime] = None,
         
         # Add date filters if provided
         if start_date:
-            params["start_date"] = start_date.isoformat()
+            params["start_date"] = _fmt_iso_z(start_date)
         if end_date:
-            params["end_date"] = end_date.isoformat()
+            params["end_date"] = _fmt_iso_z(end_date)
         
-        response = _make_canvas_request("/api/v1/calendar_events", token, params=params)
-        events_data = response.json()
+        response = _make_canvas_request(_CALENDAR_EVENTS_ENDPOINT, token, params=params)
+        events_data = _collect_pages(response, _CALENDAR_EVENTS_ENDPOINT, token, params)
         
         events = []
         for event in events_data:
             # Parse start date
-            start_date_parsed = None
             start_at_str = event.get("start_at")
-            if start_at_str:
-                try:
-                    start_date_parsed = datetime.fromisoformat(start_at_str.replace('Z', '+00:00'))
-                except ValueError:
-                    logger.warning(f"Could not parse event start date: {start_at_str}")
-                    continue
+            start_date_parsed = _parse_iso(start_at_str)
+            if start_at_str and start_date_parsed is None:
+                logger.warning(f"Could not parse event start date: {start_at_str}")
+                continue
             
             event_info = {
                 "id": event.get("id"),
                 "title": event.get("title", "Untitled Event"),
                 "start_date": start_date_parsed,
-                "end_date": None,  # Parse end_at if needed
+                "end_date": _parse_iso(event.get("end_at")),
                 "description": event.get("description"),
                 "location_name": event.get("location_name"),
                 "html_url": event.get("html_url"),
                 "context_name": event.get("context_name"),  # Course name
-                "source": "canvas_event"
+                "source": _SOURCE_CANVAS_EVENT
             }
             
-            # Parse end date if present
-            end_at_str = event.get("end_at")
-            if end_at_str:
-                try:
-                    event_info["end_date"] = datetime.fromisoformat(end_at_str.replace('Z', '+00:00'))
-                except ValueError:
-                    pass
-            
             events.append(event_info)
         
         logger.info(f"Retrieved {len(events)} calendar events")
         return events
         
-    except (TokenInvalidError, RateLimitError):
-        raise  # Re-raise these specific exceptions
-    except Exception as e:
+    except _RESPONSE_ERRORS as e:
         logger.error(f"Error fetching calendar events: {e}")
-        raise CanvasAPIError(f"Error fetching calendar events: {e}")
+        raise CanvasAPIError(f"Error fetching calendar events: {e}") from e
 
 
 def create_calendar_event(token: str, event_data: Dict[str, Any]) -> Optional[int]:
@@ -415,7 +1177,7 @@ def create_calendar_event(token: str, event_data: Dict[str, Any]) -> Optional[in
         # Prepare the event payload
         calendar_event = {
             "title": event_data.get("title", "New Event"),
-            "start_at": event_data["start_at"].isoformat(),
+            "start_at": _fmt_iso_z(event_data["start_at"]),
         }
         
         # Add optional fields
@@ -423,29 +1185,25 @@ def create_calendar_event(token: str, event_data: Dict[str, Any]) -> Optional[in
             calendar_event["description"] = event_data["description"]
         
         if "end_at" in event_data and event_data["end_at"]:
-            calendar_event["end_at"] = event_data["end_at"].isoformat()
+            calendar_event["end_at"] = _fmt_iso_z(event_data["end_at"])
         
         # If course_id is provided, create event in course context
         if "course_id" in event_data and event_data["course_id"]:
-            endpoint = f"/api/v1/courses/{event_data['course_id']}/calendar_events"
-        else:
-            endpoint = "/api/v1/calendar_events"
+            calendar_event["context_code"] = _course_context(event_data["course_id"])
         
         payload = {"calendar_event": calendar_event}
         
-        response = _make_canvas_request(endpoint, token, method="POST", data=payload)
-        created_event = response.json()
+        response = _make_canvas_request(_CALENDAR_EVENTS_ENDPOINT, token, method="POST", data=payload)
+        created_event = _json_loads(response.content)
         
         event_id = created_event.get("id")
         logger.info(f"Created calendar event with ID: {event_id}")
         
         return event_id
         
-    except (TokenInvalidError, RateLimitError):
-        raise  # Re-raise these specific exceptions
-    except Exception as e:
+    except _RESPONSE_ERRORS as e:
         logger.error(f"Error creating calendar event: {e}")
-        raise CanvasAPIError(f"Error creating calendar event: {e}")
+        raise CanvasAPIError(f"Error creating calendar event: {e}") from e
 
 
 def update_calendar_event(token: str, event_id: int, event_data: Dict[str, Any]) -> bool:
@@ -472,18 +1230,18 @@ def update_calendar_event(token: str, event_id: int, event_data: Dict[str, Any])
             calendar_event["title"] = event_data["title"]
         
         if "start_at" in event_data:
-            calendar_event["start_at"] = event_data["start_at"].isoformat()
+            calendar_event["start_at"] = _fmt_iso_z(event_data["start_at"])
         
         if "description" in event_data:
             calendar_event["description"] = event_data["description"]
         
         if "end_at" in event_data and event_data["end_at"]:
-            calendar_event["end_at"] = event_data["end_at"].isoformat()
+            calendar_event["end_at"] = _fmt_iso_z(event_data["end_at"])
         
         payload = {"calendar_event": calendar_event}
         
         response = _make_canvas_request(
-            f"/api/v1/calendar_events/{event_id}", 
+            _CALENDAR_EVENT_ENDPOINT(event_id), 
             token, 
             method="PUT", 
             data=payload
@@ -492,11 +1250,9 @@ def update_calendar_event(token: str, event_id: int, event_data: Dict[str, Any])
         logger.info(f"Updated calendar event ID: {event_id}")
         return True
         
-    except (TokenInvalidError, RateLimitError):
-        raise  # Re-raise these specific exceptions
-    except Exception as e:
+    except _RESPONSE_ERRORS as e:
         logger.error(f"Error updating calendar event {event_id}: {e}")
-        raise CanvasAPIError(f"Error updating calendar event: {e}")
+        raise CanvasAPIError(f"Error updating calendar event: {e}") from e
 
 
 def delete_calendar_event(token: str, event_id: int) -> bool:
@@ -516,7 +1272,7 @@ def delete_calendar_event(token: str, event_id: int) -> bool:
     """
     try:
         response = _make_canvas_request(
-            f"/api/v1/calendar_events/{event_id}", 
+            _CALENDAR_EVENT_ENDPOINT(event_id), 
             token, 
             method="DELETE"
         )
@@ -524,11 +1280,9 @@ def delete_calendar_event(token: str, event_id: int) -> bool:
         logger.info(f"Deleted calendar event ID: {event_id}")
         return True
         
-    except (TokenInvalidError, RateLimitError):
-        raise  # Re-raise these specific exceptions
-    except Exception as e:
+    except _RESPONSE_ERRORS as e:
         logger.error(f"Error deleting calendar event {event_id}: {e}")
-        raise CanvasAPIError(f"Error deleting calendar event: {e}")
+        raise CanvasAPIError(f"Error deleting calendar event: {e}") from e
 
 
 def test_token_permissions(token: str) -> Dict[str, bool]:
@@ -552,21 +1306,21 @@ def test_token_permissions(token: str) -> Dict[str, bool]:
     try:
         # Test user read permission
         try:
-            _make_canvas_request("/api/v1/users/self", token)
+            _make_canvas_request(_USER_SELF_ENDPOINT, token)
             permissions["read_user"] = True
         except CanvasAPIError:
             pass
         
         # Test courses read permission
         try:
-            _make_canvas_request("/api/v1/courses", token, params={"per_page": 1})
+            _make_canvas_request(_COURSES_ENDPOINT, token, params={"per_page": 1})
             permissions["read_courses"] = True
         except CanvasAPIError:
             pass
         
         # Test calendar read permission
         try:
-            _make_canvas_request("/api/v1/calendar_events", token, params={"per_page": 1})
+            _make_canvas_request(_CALENDAR_EVENTS_ENDPOINT, token, params={"per_page": 1})
             permissions["read_calendar"] = True
         except CanvasAPIError:
             pass
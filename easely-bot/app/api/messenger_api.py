@@ -5,10 +5,14 @@ This module handles all outbound communication to Facebook Messenger.
 It formats messages, handles API requests, and manages authentication.
 """
 
+import json
 import requests
 import logging
-from typing import List, Dict, Any, Optional
-from config.settings import MESSENGER_ACCESS_TOKEN
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlencode
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config.settings import get_settings
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -16,6 +20,31 @@ logger = logging.getLogger(__name__)
 # Facebook Graph API endpoint for sending messages
 MESSENGER_API_URL = "https://graph.facebook.com/v18.0/me/messages"
 
+# Graph API batch endpoint and the maximum number of requests per batch
+GRAPH_API_BATCH_URL = "https://graph.facebook.com/v18.0/"
+MESSENGER_BATCH_SIZE = 50
+
+
+def _create_session() -> requests.Session:
+    """
+    Create the HTTP session shared by all Graph API requests.
+    
+    Reusing one session keeps TLS connections to graph.facebook.com alive,
+    so consecutive sends skip the connect and handshake. Only connection
+    failures are retried; a POST that reached Facebook is never resent.
+    
+    Returns:
+        requests.Session: Configured session
+    """
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.2)
+    session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry))
+    return session
+
+
+# Shared HTTP session - one connection pool for the whole process
+_SESSION = _create_session()
+
 
 def send_text_message(user_id: str, text: str) -> bool:
     """
@@ -194,10 +223,10 @@ def send_persistent_menu_setup(menu_items: List[Dict[str, Any]]) -> bool:
         ]
     }
     
-    params = {"access_token": MESSENGER_ACCESS_TOKEN}
+    params = {"access_token": get_settings().messenger_access_token}
     
     try:
-        response = requests.post(url, json=payload, params=params, timeout=30)
+        response = _SESSION.post(url, json=payload, params=params, timeout=30)
         
         if response.status_code == 200:
             logger.info("Persistent menu set up successfully")
@@ -221,10 +250,10 @@ def _send_message(payload: Dict[str, Any]) -> bool:
     Returns:
         bool: True if message sent successfully, False otherwise
     """
-    params = {"access_token": MESSENGER_ACCESS_TOKEN}
+    params = {"access_token": get_settings().messenger_access_token}
     
     try:
-        response = requests.post(
+        response = _SESSION.post(
             MESSENGER_API_URL, 
             json=payload, 
             params=params,
@@ -265,6 +294,71 @@ def _send_message(payload: Dict[str, Any]) -> bool:
         return False
 
 
+def send_text_messages_batch(items: List[Tuple[str, str]]) -> List[bool]:
+    """
+    Send several text messages using the Graph API batch endpoint.
+    
+    Items are grouped into batches of MESSENGER_BATCH_SIZE, so each batch
+    costs a single HTTPS request instead of one request per message.
+    
+    Args:
+        items (List[Tuple[str, str]]): (user_id, text) pairs to send
+        
+    Returns:
+        List[bool]: Per-item success flags, in the same order as items
+    """
+    results: List[bool] = []
+    
+    for start in range(0, len(items), MESSENGER_BATCH_SIZE):
+        chunk = items[start:start + MESSENGER_BATCH_SIZE]
+        batch = [
+            {
+                "method": "POST",
+                "relative_url": "me/messages",
+                "body": urlencode({
+                    "recipient": json.dumps({"id": user_id}),
+                    "message": json.dumps({"text": text})
+                })
+            }
+            for user_id, text in chunk
+        ]
+        
+        try:
+            response = _SESSION.post(
+                GRAPH_API_BATCH_URL,
+                data={
+                    "access_token": get_settings().messenger_access_token,
+                    "batch": json.dumps(batch)
+                },
+                timeout=30
+            )
+            
+            if response.status_code != 200:
+                logger.error(f"Messenger batch API error {response.status_code}: {response.text}")
+                results.extend([False] * len(chunk))
+                continue
+            
+            # Each entry is {"code": ..., "body": ...}, or null if it did not run
+            for (user_id, _), entry in zip(chunk, response.json()):
+                if entry and entry.get("code") == 200:
+                    results.append(True)
+                else:
+                    logger.error(f"Batch message to user {user_id} failed: {entry}")
+                    results.append(False)
+                    
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Network error sending message batch: {e}")
+            results.extend([False] * len(chunk))
+        except ValueError as e:
+            logger.error(f"Invalid response from Messenger batch API: {e}")
+            results.extend([False] * len(chunk))
+        
+        # Pad in case the response was shorter than the batch
+        results.extend([False] * (start + len(chunk) - len(results)))
+    
+    return results
+
+
 # Convenience functions for common Easely-specific message patterns
 
 def send_welcome_message(user_id: str) -> bool:
@@ -29,6 +29,7 @@ from .models import (
     User,
     Task, 
     Course,
+    ReminderSent,
     SubscriptionTier,
     TaskSource,
     create_all_tables,
@@ -57,6 +58,7 @@ __all__ = [
     "User",
     "Task",
     "Course", 
+    "ReminderSent",
     "SubscriptionTier",
     "TaskSource",
     "create_all_tables",
@@ -106,6 +106,22 @@ class User(Base):
         lazy="dynamic"
     )
     
+    # Indexes for efficient querying
+    __table_args__ = (
+        # Partial index so the daily expiry sweep only scans premium users
+        Index(
+            'idx_user_premium_expiry',
+            'subscription_expiry_date',
+            postgresql_where=(subscription_tier == SubscriptionTier.PREMIUM)
+        ),
+        # Partial index over the users the Canvas refresh job walks
+        Index(
+            'idx_user_active_valid_token',
+            'id',
+            postgresql_where=(is_active == True) & (token_invalid == False) & canvas_token.isnot(None)
+        ),
+    )
+    
     def __repr__(self) -> str:
         return f"<User(id={self.id}, messenger_id='{self.messenger_id}', tier={self.subscription_tier.value})>"
     
@@ -243,6 +259,13 @@ class Task(Base):
         Index('idx_task_user_active', 'user_id', 'is_deleted', 'is_completed'),
         Index('idx_task_due_date_active', 'due_date', 'is_deleted'),
         
+        # Partial index for the reminder job's due_date range scans
+        Index(
+            'idx_task_due_date_open',
+            'due_date',
+            postgresql_where=(is_completed == False) & (is_deleted == False)
+        ),
+        
         # Unique constraints for Canvas items
         UniqueConstraint('user_id', 'canvas_assignment_id', name='uq_user_canvas_assignment'),
         UniqueConstraint('user_id', 'canvas_event_id', name='uq_user_canvas_event'),
@@ -296,6 +319,37 @@ class Task(Base):
             setattr(self, reminder_mapping[reminder_type], True)
 
 
+class ReminderSent(Base):
+    """
+    Log of reminders claimed for sending.
+    
+    The unique constraint on (task_id, window_name, target_bucket) makes
+    sending idempotent: a reminder is only sent by the run that manages to
+    insert its row, so retries and overlapping runs cannot send it twice.
+    """
+    __tablename__ = 'reminder_sent'
+    
+    # Primary key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # Task the reminder was for
+    task_id = Column(Integer, ForeignKey('tasks.id', ondelete='CASCADE'), nullable=False, index=True)
+    
+    # Reminder window (e.g., "1_week") and its target time in whole hours since the epoch
+    window_name = Column(String(20), nullable=False)
+    target_bucket = Column(Integer, nullable=False)
+    
+    # Audit fields
+    created_at = Column(DateTime(timezone=True), default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('task_id', 'window_name', 'target_bucket', name='uq_reminder_sent_task_window_bucket'),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<ReminderSent(task_id={self.task_id}, window='{self.window_name}', bucket={self.target_bucket})>"
+
+
 # Optional: Create all tables (useful for testing)
 def create_all_tables(engine):
     """
@@ -11,13 +11,14 @@ through proper transaction management.
 
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Tuple, Iterator
 
-from sqlalchemy import and_, or_, func, desc, asc
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, or_, func, desc, asc, bindparam, update, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
-from .models import User, Task, Course, SubscriptionTier, TaskSource
+from .models import User, Task, Course, ReminderSent, SubscriptionTier, TaskSource
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -194,6 +195,35 @@ def mark_user_token_invalid(session: Session, user_id: int) -> bool:
         return False
 
 
+def update_user_token_status(session: Session, user_id: int, is_valid: bool) -> bool:
+    """
+    Set whether a user's Canvas token is valid, without committing.
+    
+    Used by background jobs that manage their own transaction boundaries.
+    
+    Args:
+        session: Database session
+        user_id: User ID
+        is_valid: Whether the token is valid
+        
+    Returns:
+        True if a user was updated, False otherwise
+    """
+    try:
+        updated = session.query(User).filter(User.id == user_id).update(
+            {User.token_invalid: not is_valid},
+            synchronize_session=False
+        )
+        
+        if updated and not is_valid:
+            logger.info(f"Marked token invalid for user {user_id}")
+        return bool(updated)
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error updating token status for user {user_id}: {e}")
+        return False
+
+
 def increment_user_monthly_tasks(session: Session, user_id: int) -> bool:
     """
     Increment user's monthly manual task counter.
@@ -278,6 +308,56 @@ def create_or_update_courses(session: Session, user_id: int, courses_data: List[
         return False
 
 
+def bulk_upsert_courses(session: Session, user_id: int, courses_data: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Insert or update a user's courses in a single statement (used by the data refresh job).
+    
+    Unlike create_or_update_courses this does not commit; it runs inside a
+    savepoint so the caller's transaction decides what is kept.
+    
+    Args:
+        session: Database session
+        user_id: User ID
+        courses_data: List of course dictionaries with canvas_course_id, course_name, course_code
+    
+    Returns:
+        Dictionary mapping each upserted Canvas course ID to its Course.id
+    """
+    if not courses_data:
+        return {}
+    
+    courses_table = Course.__table__
+    rows = [
+        {
+            'user_id': user_id,
+            'canvas_course_id': course_data['canvas_course_id'],
+            'course_name': course_data['course_name'],
+            'course_code': course_data.get('course_code'),
+            'is_active': True
+        }
+        for course_data in courses_data
+    ]
+    
+    try:
+        with session.begin_nested():
+            stmt = pg_insert(courses_table).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['user_id', 'canvas_course_id'],
+                set_={
+                    'course_name': stmt.excluded.course_name,
+                    'course_code': stmt.excluded.course_code,
+                    'is_active': True,
+                    'updated_at': func.now()
+                }
+            ).returning(courses_table.c.canvas_course_id, courses_table.c.id)
+            
+            return {canvas_course_id: course_id for canvas_course_id, course_id in session.execute(stmt)}
+    
+    except SQLAlchemyError as e:
+        logger.error(f"Error bulk upserting courses for user {user_id}: {e}")
+        raise
+
+
 def get_user_courses(session: Session, user_id: int, active_only: bool = True) -> List[Course]:
     """
     Get all courses for a user.
@@ -590,6 +670,56 @@ def get_all_upcoming_tasks(session: Session, user_id: int, limit: int = 20) -> L
         return []
 
 
+def get_all_upcoming_tasks_columnar(session: Session, user_id: int) -> Dict[str, List[Any]]:
+    """
+    Get every upcoming task for a user as column lists (for spreadsheet export).
+
+    Runs a single SELECT of only the exported fields and appends each row
+    straight into per-column lists, so callers can wrap the result in a
+    DataFrame without building an intermediate dict per task.
+
+    Args:
+        session: Database session
+        user_id: User ID
+
+    Returns:
+        Dictionary with 'title', 'due_date', 'course_name' and 'source' lists
+    """
+    columns = {'title': [], 'due_date': [], 'course_name': [], 'source': []}
+
+    try:
+        now = datetime.now(timezone.utc)
+
+        rows = session.query(
+            Task.title,
+            Task.due_date,
+            Course.course_name,
+            Task.source
+        ).outerjoin(Course, Task.course_id == Course.id).filter(
+            Task.user_id == user_id,
+            Task.is_deleted == False,
+            Task.is_completed == False,
+            Task.due_date >= now
+        ).order_by(Task.due_date)
+
+        titles = columns['title'].append
+        due_dates = columns['due_date'].append
+        course_names = columns['course_name'].append
+        sources = columns['source'].append
+
+        for title, due_date, course_name, source in rows:
+            titles(title)
+            due_dates(due_date)
+            course_names(course_name)
+            sources(source.value if source else None)
+
+        return columns
+
+    except SQLAlchemyError as e:
+        logger.error(f"Error fetching upcoming task columns for user {user_id}: {e}")
+        return {'title': [], 'due_date': [], 'course_name': [], 'source': []}
+
+
 # =============================================================================
 # BACKGROUND JOB FUNCTIONS
 # =============================================================================
@@ -618,7 +748,9 @@ def get_tasks_needing_reminders(session: Session) -> Dict[str, List[Task]]:
         
         for reminder_type, (start_time, end_time) in reminder_windows.items():
             # Build query for this reminder type
-            query = session.query(Task).join(User).filter(
+            query = session.query(Task).join(User).options(
+                selectinload(Task.user)
+            ).filter(
                 Task.is_deleted == False,
                 Task.is_completed == False,
                 Task.due_date >= start_time,
@@ -665,6 +797,94 @@ def get_tasks_needing_reminders(session: Session) -> Dict[str, List[Task]]:
         return {}
 
 
+def get_reminder_matches(session: Session, windows_by_tier: Dict[SubscriptionTier, List[Any]],
+                         now: Optional[datetime] = None,
+                         tolerance: timedelta = timedelta(minutes=30)) -> List[Tuple[Task, str]]:
+    """
+    Get (task, window_name) pairs for every task currently inside a reminder window.
+    
+    The window matching runs in PostgreSQL: one UNION ALL branch per tier and
+    window, each a due_date range scan restricted to users of that tier.
+    
+    Args:
+        session: Database session
+        windows_by_tier: Subscription tier -> reminder windows, each with
+            name and hours_before attributes
+        now: Reference time (defaults to the current UTC time)
+        tolerance: How far either side of the exact reminder time still matches
+        
+    Returns:
+        List of (Task, window_name) tuples, or None if the query failed
+    """
+    try:
+        now = now or datetime.now(timezone.utc)
+        branches = []
+        
+        for tier, windows in windows_by_tier.items():
+            for window in windows:
+                target = now + timedelta(hours=window.hours_before)
+                
+                query = session.query(
+                    Task, literal(window.name).label('window_name')
+                ).join(User, Task.user_id == User.id).filter(
+                    Task.is_deleted == False,
+                    Task.is_completed == False,
+                    Task.due_date.between(target - tolerance, target + tolerance),
+                    User.is_active == True,
+                    User.reminder_enabled == True,
+                    User.subscription_tier == tier
+                )
+                
+                # Skip tasks whose reminder flag for this window is already set
+                sent_column = getattr(Task, f"reminder_{window.name}_sent", None)
+                if sent_column is not None:
+                    query = query.filter(sent_column == False)
+                
+                branches.append(query)
+        
+        if not branches:
+            return []
+        
+        # Load every matched task's user in one extra SELECT rather than one per task
+        query = branches[0].union_all(*branches[1:]).options(selectinload(Task.user))
+        return [(task, window_name) for task, window_name in query.all()]
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error fetching reminder matches: {e}")
+        return None
+
+
+def get_open_tasks_due_between(session: Session, start: datetime, end: datetime) -> List[Task]:
+    """
+    Get open tasks due in a time range for users who want reminders.
+    
+    Used by the reminder job to match windows in Python when
+    get_reminder_matches cannot run.
+    
+    Args:
+        session: Database session
+        start: Earliest due date (inclusive)
+        end: Latest due date (inclusive)
+        
+    Returns:
+        List of Task objects ordered by due date, with users loaded
+    """
+    try:
+        return session.query(Task).join(User, Task.user_id == User.id).options(
+            selectinload(Task.user)
+        ).filter(
+            Task.is_deleted == False,
+            Task.is_completed == False,
+            Task.due_date.between(start, end),
+            User.is_active == True,
+            User.reminder_enabled == True
+        ).order_by(Task.due_date).all()
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error fetching tasks due between {start} and {end}: {e}")
+        return []
+
+
 def mark_reminder_sent(session: Session, task_id: int, reminder_type: str) -> bool:
     """
     Mark a specific reminder as sent for a task.
@@ -692,6 +912,151 @@ def mark_reminder_sent(session: Session, task_id: int, reminder_type: str) -> bo
         return False
 
 
+def bulk_mark_reminders_sent(session: Session, task_ids_by_type: Dict[str, List[int]]) -> int:
+    """
+    Mark reminders as sent for many tasks, one UPDATE per reminder type.
+    
+    The caller is responsible for committing the session.
+    
+    Args:
+        session: Database session
+        task_ids_by_type: Reminder type ('1_week', '3_days', etc.) -> task IDs
+        
+    Returns:
+        Number of task rows updated
+    """
+    reminder_columns = {
+        '1_week': 'reminder_1_week_sent',
+        '3_days': 'reminder_3_days_sent',
+        '1_day': 'reminder_1_day_sent',
+        '8_hours': 'reminder_8_hours_sent',
+        '2_hours': 'reminder_2_hours_sent',
+        '1_hour': 'reminder_1_hour_sent',
+    }
+    
+    try:
+        updated = 0
+        tasks_table = Task.__table__
+        
+        for reminder_type, task_ids in task_ids_by_type.items():
+            column = reminder_columns.get(reminder_type)
+            if column is None:
+                logger.warning(f"Unknown reminder type: {reminder_type}")
+                continue
+            if not task_ids:
+                continue
+            
+            result = session.execute(
+                update(tasks_table)
+                .where(tasks_table.c.id.in_(task_ids))
+                .values({column: True})
+            )
+            updated += result.rowcount
+        
+        return updated
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error bulk marking reminders sent: {e}")
+        session.rollback()
+        raise
+
+
+def claim_reminders(session: Session, claims: List[Tuple[int, str, int]]) -> Dict[Tuple[int, str], int]:
+    """
+    Claim reminders for sending by inserting them into the sent-log.
+    
+    Claims that already exist are skipped (ON CONFLICT DO NOTHING), so only
+    reminders that have not been sent for this target time are returned.
+    The caller is responsible for committing the session.
+    
+    Args:
+        session: Database session
+        claims: (task_id, window_name, target_bucket) tuples
+        
+    Returns:
+        Dictionary mapping (task_id, window_name) to the claim ID for each new claim
+    """
+    if not claims:
+        return {}
+    
+    try:
+        result = session.execute(
+            pg_insert(ReminderSent.__table__)
+            .values([
+                {'task_id': task_id, 'window_name': window_name, 'target_bucket': target_bucket}
+                for task_id, window_name, target_bucket in claims
+            ])
+            .on_conflict_do_nothing(
+                index_elements=['task_id', 'window_name', 'target_bucket']
+            )
+            .returning(
+                ReminderSent.__table__.c.id,
+                ReminderSent.__table__.c.task_id,
+                ReminderSent.__table__.c.window_name
+            )
+        )
+        
+        return {(row.task_id, row.window_name): row.id for row in result}
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error claiming reminders: {e}")
+        session.rollback()
+        raise
+
+
+def count_users_with_reminder_claims(session: Session, claim_ids: List[int]) -> int:
+    """
+    Count distinct users behind a set of reminder claims.
+    
+    Args:
+        session: Database session
+        claim_ids: IDs returned by claim_reminders
+        
+    Returns:
+        Number of distinct users
+    """
+    if not claim_ids:
+        return 0
+    
+    try:
+        return session.query(func.count(func.distinct(Task.user_id))).join(
+            ReminderSent, ReminderSent.task_id == Task.id
+        ).filter(
+            ReminderSent.id.in_(claim_ids)
+        ).scalar() or 0
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error counting users for {len(claim_ids)} reminder claims: {e}")
+        return 0
+
+
+def release_reminder_claims(session: Session, claim_ids: List[int]) -> int:
+    """
+    Delete reminder claims whose send failed so a later run can retry them.
+    
+    The caller is responsible for committing the session.
+    
+    Args:
+        session: Database session
+        claim_ids: IDs returned by claim_reminders
+        
+    Returns:
+        Number of claims released
+    """
+    if not claim_ids:
+        return 0
+    
+    try:
+        return session.query(ReminderSent).filter(
+            ReminderSent.id.in_(claim_ids)
+        ).delete(synchronize_session=False)
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error releasing reminder claims: {e}")
+        session.rollback()
+        raise
+
+
 def get_expired_premium_users(session: Session) -> List[User]:
     """
     Get users whose premium subscriptions have expired.
@@ -715,6 +1080,40 @@ def get_expired_premium_users(session: Session) -> List[User]:
         return []
 
 
+def bulk_revert_expired_premium(session: Session) -> List[Tuple[int, str]]:
+    """
+    Revert every expired premium user to the free tier in a single UPDATE.
+    
+    The caller is responsible for committing the session.
+    
+    Returns:
+        List of (user_id, messenger_id) tuples for the reverted users
+    """
+    try:
+        now = datetime.now(timezone.utc)
+        users_table = User.__table__
+        
+        result = session.execute(
+            update(users_table).where(
+                users_table.c.subscription_tier == SubscriptionTier.PREMIUM,
+                users_table.c.subscription_expiry_date < now,
+                users_table.c.is_active == True
+            ).values(
+                subscription_tier=SubscriptionTier.FREE,
+                subscription_expiry_date=None
+            ).returning(users_table.c.id, users_table.c.messenger_id)
+        )
+        
+        reverted = [(row.id, row.messenger_id) for row in result]
+        logger.info(f"Reverted {len(reverted)} expired premium users to free tier")
+        return reverted
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error bulk reverting expired premium users: {e}")
+        session.rollback()
+        raise
+
+
 def downgrade_expired_users(session: Session, user_ids: List[int]) -> int:
     """
     Downgrade expired premium users to free tier.
@@ -776,6 +1175,68 @@ def get_users_for_weekly_digest(session: Session) -> List[User]:
 # DATA REFRESH FUNCTIONS
 # =============================================================================
 
+def count_active_users(session: Session) -> int:
+    """
+    Count active users with a valid Canvas token.
+    
+    Args:
+        session: Database session
+        
+    Returns:
+        Number of users get_active_users will yield
+    """
+    try:
+        return session.query(func.count(User.id)).filter(
+            User.is_active == True,
+            User.token_invalid == False,
+            User.canvas_token.isnot(None)
+        ).scalar() or 0
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error counting active users: {e}")
+        return 0
+
+
+def get_active_users(session: Session, batch_size: int = 200) -> Iterator[User]:
+    """
+    Stream active users with a valid Canvas token, loading batch_size rows at a time.
+    
+    Users whose token was marked invalid are skipped until they link Canvas
+    again (update_user_canvas_info resets the flag).
+    
+    Pages are fetched by ascending user ID (keyset pagination) rather than
+    through one open cursor, so the caller may commit the session between
+    batches while iterating.
+    
+    Args:
+        session: Database session
+        batch_size: Number of users loaded per query
+        
+    Yields:
+        User objects in ascending ID order
+    """
+    last_id = 0
+    
+    while True:
+        try:
+            users = session.query(User).filter(
+                User.is_active == True,
+                User.token_invalid == False,
+                User.canvas_token.isnot(None),
+                User.id > last_id
+            ).order_by(User.id).limit(batch_size).all()
+            
+        except SQLAlchemyError as e:
+            logger.error(f"Error fetching active users after ID {last_id}: {e}")
+            raise
+        
+        if not users:
+            return
+        
+        yield from users
+        last_id = users[-1].id
+
+
 def get_users_for_canvas_refresh(session: Session, batch_size: int = 10) -> List[User]:
     """
     Get a batch of users for Canvas data refresh (staggered updates).
@@ -839,4 +1300,153 @@ def update_user_last_sync(session: Session, user_id: int, success: bool = True)
     except SQLAlchemyError as e:
         logger.error(f"Error updating last sync for user {user_id}: {e}")
         session.rollback()
-        return False
\ No newline at end of file
+        return False
+
+
+def get_all_canvas_tasks_by_user(session: Session, user_ids: List[int]) -> Dict[int, List[Task]]:
+    """
+    Get the Canvas assignment tasks of many users in a single query.
+    
+    Used by the data refresh job to load every user's existing tasks up
+    front instead of issuing one SELECT per user.
+    
+    Args:
+        session: Database session
+        user_ids: IDs of the users being refreshed
+        
+    Returns:
+        Dictionary mapping each user ID to its list of Canvas Task objects
+    """
+    tasks_by_user = {user_id: [] for user_id in user_ids}
+    
+    if not user_ids:
+        return tasks_by_user
+    
+    try:
+        tasks = session.query(Task).filter(
+            Task.user_id.in_(user_ids),
+            Task.canvas_assignment_id.isnot(None),
+            Task.is_deleted == False
+        ).order_by(Task.user_id).all()
+        
+        for task in tasks:
+            tasks_by_user[task.user_id].append(task)
+        
+        return tasks_by_user
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error bulk fetching Canvas tasks for {len(user_ids)} users: {e}")
+        raise
+
+
+def get_all_courses_by_user(session: Session, user_ids: List[int], 
+                            active_only: bool = True) -> Dict[int, List[Course]]:
+    """
+    Get the courses of many users in a single query.
+    
+    Args:
+        session: Database session
+        user_ids: IDs of the users being refreshed
+        active_only: Whether to return only active courses
+        
+    Returns:
+        Dictionary mapping each user ID to its list of Course objects
+    """
+    courses_by_user = {user_id: [] for user_id in user_ids}
+    
+    if not user_ids:
+        return courses_by_user
+    
+    try:
+        query = session.query(Course).filter(Course.user_id.in_(user_ids))
+        
+        if active_only:
+            query = query.filter(Course.is_active == True)
+        
+        for course in query.order_by(Course.user_id, Course.course_name).all():
+            courses_by_user[course.user_id].append(course)
+        
+        return courses_by_user
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error bulk fetching courses for {len(user_ids)} users: {e}")
+        raise
+
+
+def bulk_sync_canvas_tasks(session: Session, user_id: int, to_insert: List[Dict[str, Any]],
+                           to_update: List[Dict[str, Any]], to_delete_ids: List[int]) -> Tuple[int, int, int]:
+    """
+    Apply one user's Canvas assignment diff with three set-based statements.
+    
+    All statements run inside a savepoint, so a failure rewinds only this
+    user's changes and leaves the surrounding transaction usable. A new task
+    whose assignment was soft deleted earlier is restored and refreshed
+    rather than skipped.
+    
+    Args:
+        session: Database session
+        user_id: User ID
+        to_insert: New tasks as dicts with canvas_assignment_id, course_id, title, due_date
+        to_update: Changed tasks as dicts with _id, title, due_date
+        to_delete_ids: IDs of tasks no longer present in Canvas (soft deleted)
+        
+    Returns:
+        Tuple of (added_count, updated_count, deleted_count)
+    """
+    tasks_table = Task.__table__
+    added_count = updated_count = deleted_count = 0
+    
+    try:
+        with session.begin_nested():
+            if to_insert:
+                rows = [
+                    {
+                        'user_id': user_id,
+                        'canvas_assignment_id': row['canvas_assignment_id'],
+                        'course_id': row.get('course_id'),
+                        'title': row['title'],
+                        'due_date': row['due_date'],
+                        'source': TaskSource.CANVAS_ASSIGNMENT
+                    }
+                    for row in to_insert
+                ]
+                stmt = pg_insert(tasks_table).values(rows)
+                result = session.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=['user_id', 'canvas_assignment_id'],
+                        set_={
+                            'course_id': stmt.excluded.course_id,
+                            'title': stmt.excluded.title,
+                            'due_date': stmt.excluded.due_date,
+                            'is_deleted': False,
+                            'updated_at': func.now()
+                        }
+                    )
+                )
+                added_count = result.rowcount
+            
+            if to_update:
+                session.execute(
+                    update(tasks_table).where(
+                        tasks_table.c.id == bindparam('_id')
+                    ).values(
+                        title=bindparam('title'),
+                        due_date=bindparam('due_date')
+                    ),
+                    to_update
+                )
+                updated_count = len(to_update)
+            
+            if to_delete_ids:
+                result = session.execute(
+                    update(tasks_table).where(
+                        tasks_table.c.id.in_(to_delete_ids)
+                    ).values(is_deleted=True)
+                )
+                deleted_count = result.rowcount
+        
+        return added_count, updated_count, deleted_count
+        
+    except SQLAlchemyError as e:
+        logger.error(f"Error bulk syncing Canvas tasks for user {user_id}: {e}")
+        raise
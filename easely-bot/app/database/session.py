@@ -12,6 +12,7 @@ Core Responsibilities:
 """
 
 import logging
+import os
 from contextlib import contextmanager
 from typing import Generator
 
@@ -21,7 +22,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.pool import QueuePool
 
 # Import database configuration
-from ..config.settings import DATABASE_URI
+from config.settings import get_settings
 
 # Configure logging for database operations
 logger = logging.getLogger(__name__)
@@ -31,6 +32,19 @@ engine: Engine = None
 SessionLocal: sessionmaker = None
 
 
+def get_pool_size() -> int:
+    """
+    Get the connection pool size for this process.
+    
+    Background jobs can set POSTGRES_JOB_POOL_SIZE to size the pool for
+    their own concurrency; otherwise the configured db_pool_size is used.
+    
+    Returns:
+        int: Number of pooled connections to maintain
+    """
+    return int(os.environ.get("POSTGRES_JOB_POOL_SIZE", get_settings().db_pool_size))
+
+
 def create_database_engine() -> Engine:
     """
     Create and configure the SQLAlchemy database engine.
@@ -44,13 +58,14 @@ def create_database_engine() -> Engine:
     try:
         # Create engine with production-ready configuration
         db_engine = create_engine(
-            DATABASE_URI,
+            get_settings().database_uri,
             # Connection pool settings for efficiency
             poolclass=QueuePool,
-            pool_size=5,  # Number of connections to maintain
-            max_overflow=10,  # Additional connections when pool is full
+            pool_size=get_pool_size(),  # Number of connections to maintain
+            max_overflow=get_settings().db_max_overflow,  # Additional connections when pool is full
+            pool_timeout=get_settings().db_pool_timeout,  # Seconds to wait for a free connection
             pool_pre_ping=True,  # Validate connections before use
-            pool_recycle=3600,  # Recycle connections every hour
+            pool_recycle=1800,  # Recycle connections every 30 minutes
             # Echo SQL queries in development (set to False in production)
             echo=False,
             # Additional connection arguments
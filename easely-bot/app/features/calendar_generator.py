@@ -19,21 +19,142 @@ import pandas as pd
 import logging
 import boto3
 import io
+import os
+import atexit
+import functools
 import uuid
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 from botocore.exceptions import ClientError, BotoCoreError
 
-from app.database.queries import get_all_upcoming_tasks
+from app.database.session import get_db_session
+from app.database.queries import get_all_upcoming_tasks_columnar
 from config.settings import AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_S3_BUCKET_NAME, AWS_REGION
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a worker to build one workbook before giving up
+XLSX_BUILD_TIMEOUT = 60
+
+
+@functools.lru_cache(maxsize=1)
+def _get_xlsx_pool() -> ProcessPoolExecutor:
+    """
+    Get the worker pool for CPU-bound Excel serialization.
+    
+    The pool is created on first use rather than at import, so the web app
+    and tests that merely import this module never start worker processes.
+    It is shut down when the interpreter exits.
+    
+    Returns:
+        ProcessPoolExecutor: Shared process pool
+    """
+    pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    atexit.register(pool.shutdown)
+    return pool
+
+
 class CalendarGeneratorError(Exception):
     """Custom exception for calendar generation related errors"""
     pass
 
+def _build_xlsx_bytes(records: List[Dict[str, Any]], columns: List[str], user_id: str) -> bytes:
+    """
+    Build the Excel workbook for a user's schedule and return its raw bytes
+    
+    Runs inside a worker of the shared process pool, so it must stay a
+    top-level (picklable) function and only take plain Python arguments.
+    
+    Args:
+        records (List[Dict[str, Any]]): Structured task rows (DataFrame records)
+        columns (List[str]): Column order of the structured DataFrame
+        user_id (str): User identifier for personalization
+        
+    Returns:
+        bytes: The generated .xlsx file contents
+    """
+    df = pd.DataFrame(records, columns=columns)
+    
+    # Create in-memory buffer
+    buffer = io.BytesIO()
+    
+    # Generate timestamp for the file
+    timestamp = datetime.now().strftime('%Y-%m-%d %I:%M %p')
+    
+    # Create Excel writer with openpyxl engine for better formatting
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        # Write main data to 'My Schedule' sheet
+        df.to_excel(writer, sheet_name='My Schedule', index=False)
+        
+        # Get the workbook and worksheet for formatting
+        workbook = writer.book
+        worksheet = writer.sheets['My Schedule']
+        
+        # Add title and metadata
+        worksheet.insert_rows(1, 3)
+        worksheet['A1'] = f'Easely Academic Calendar'
+        worksheet['A2'] = f'Generated: {timestamp}'
+        worksheet['A3'] = f'Total Tasks: {len(df)}'
+        
+        # Format header row (now row 4)
+        header_row = 4
+        for col_num, column_title in enumerate(df.columns, 1):
+            cell = worksheet.cell(row=header_row, column=col_num)
+            cell.value = column_title
+            cell.font = workbook.create_font(bold=True)
+            cell.fill = workbook.create_fill(
+                fill_type='solid',
+                start_color='E6E6FA'  # Light lavender
+            )
+        
+        # Auto-adjust column widths
+        for column in worksheet.columns:
+            max_length = 0
+            column_letter = column[0].column_letter
+            
+            for cell in column:
+                try:
+                    if len(str(cell.value)) > max_length:
+                        max_length = len(str(cell.value))
+                except:
+                    pass
+            
+            adjusted_width = min(max_length + 2, 50)  # Cap at 50 chars
+            worksheet.column_dimensions[column_letter].width = adjusted_width
+        
+        # Add summary sheet if there are tasks
+        if len(df) > 0:
+            summary_data = {
+                'Metric': [
+                    'Total Tasks',
+                    'Overdue Tasks', 
+                    'Due Today/Tomorrow',
+                    'Canvas Assignments',
+                    'Personal Tasks'
+                ],
+                'Count': [
+                    len(df),
+                    len(df[df['Status'] == 'Overdue']),
+                    len(df[df['Status'] == 'Due Soon']),
+                    len(df[df['Task Type'] == 'Canvas Assignment']),
+                    len(df[df['Task Type'] == 'Personal Task'])
+                ]
+            }
+            
+            summary_df = pd.DataFrame(summary_data)
+            summary_df.to_excel(writer, sheet_name='Summary', index=False)
+            
+            # Format summary sheet
+            summary_sheet = writer.sheets['Summary']
+            summary_sheet['A1'].font = workbook.create_font(bold=True)
+            summary_sheet['B1'].font = workbook.create_font(bold=True)
+    
+    return buffer.getvalue()
+
+
 class CalendarGenerator:
     """
     Administrative Assistant for generating downloadable calendar files
@@ -59,7 +180,7 @@ class CalendarGenerator:
             logger.error(f"Failed to initialize S3 client: {e}")
             raise CalendarGeneratorError("Failed to initialize cloud storage connection")
     
-    def _fetch_user_tasks(self, user_id: str) -> List[Dict[str, Any]]:
+    def _fetch_user_tasks(self, user_id: str) -> Dict[str, List[Any]]:
         """
         Fetch all upcoming tasks for a user from the database
         
@@ -67,54 +188,58 @@ class CalendarGenerator:
             user_id (str): The user's unique identifier
             
         Returns:
-            List[Dict[str, Any]]: List of task dictionaries
+            Dict[str, List[Any]]: Task columns ('title', 'due_date', 'course_name', 'source')
             
         Raises:
             CalendarGeneratorError: If data fetching fails
         """
         try:
             logger.info(f"Fetching tasks for user: {user_id}")
-            tasks = get_all_upcoming_tasks(user_id)
+            with get_db_session() as session:
+                tasks = get_all_upcoming_tasks_columnar(session, user_id)
             
-            if not tasks:
+            task_count = len(tasks['title'])
+            if not task_count:
                 logger.warning(f"No upcoming tasks found for user: {user_id}")
-                return []
+                return tasks
             
-            logger.info(f"Successfully fetched {len(tasks)} tasks for user: {user_id}")
+            logger.info(f"Successfully fetched {task_count} tasks for user: {user_id}")
             return tasks
             
         except Exception as e:
             logger.error(f"Failed to fetch tasks for user {user_id}: {e}")
             raise CalendarGeneratorError("Failed to retrieve your tasks from the database")
     
-    def _structure_data_for_spreadsheet(self, tasks: List[Dict[str, Any]]) -> pd.DataFrame:
+    def _structure_data_for_spreadsheet(self, tasks: Dict[str, List[Any]]) -> pd.DataFrame:
         """
         Structure task data into a pandas DataFrame suitable for Excel export
         
         Args:
-            tasks (List[Dict[str, Any]]): Raw task data from database
+            tasks (Dict[str, List[Any]]): Task columns from the database
             
         Returns:
             pd.DataFrame: Structured data ready for Excel generation
         """
-        if not tasks:
+        columns = {
+            'Task Title': [],
+            'Due Date': [],
+            'Due Time': [],
+            'Course Name': [],
+            'Task Type': [],
+            'Status': []
+        }
+        
+        if not tasks or not tasks.get('title'):
             # Return empty DataFrame with proper structure
-            return pd.DataFrame(columns=[
-                'Task Title', 
-                'Due Date', 
-                'Due Time', 
-                'Course Name', 
-                'Task Type', 
-                'Status'
-            ])
+            return pd.DataFrame(columns=list(columns))
         
-        structured_data = []
         current_time = datetime.now(timezone.utc)
         
-        for task in tasks:
+        for title, due_date, course_name, source in zip(
+            tasks['title'], tasks['due_date'], tasks['course_name'], tasks['source']
+        ):
             try:
                 # Extract and format due date/time
-                due_date = task.get('due_date')
                 if due_date:
                     # Convert to local timezone if needed and format
                     if isinstance(due_date, str):
@@ -136,8 +261,7 @@ class CalendarGenerator:
                     status = 'Unknown'
                 
                 # Determine task type
-                source = task.get('source', 'unknown')
-                if source == 'canvas_sync':
+                if source in ('canvas_sync', 'canvas_assignment', 'canvas_event'):
                     task_type = 'Canvas Assignment'
                 elif source == 'manual_entry':
                     task_type = 'Personal Task'
@@ -145,31 +269,25 @@ class CalendarGenerator:
                     task_type = 'Unknown'
                 
                 # Structure the row
-                row = {
-                    'Task Title': task.get('title', 'Untitled Task'),
-                    'Due Date': formatted_date,
-                    'Due Time': formatted_time,
-                    'Course Name': task.get('course_name', 'No Course'),
-                    'Task Type': task_type,
-                    'Status': status
-                }
-                
-                structured_data.append(row)
+                columns['Task Title'].append(title or 'Untitled Task')
+                columns['Due Date'].append(formatted_date)
+                columns['Due Time'].append(formatted_time)
+                columns['Course Name'].append(course_name or 'No Course')
+                columns['Task Type'].append(task_type)
+                columns['Status'].append(status)
                 
             except Exception as e:
-                logger.warning(f"Failed to process task: {task.get('title', 'Unknown')}, Error: {e}")
+                logger.warning(f"Failed to process task: {title or 'Unknown'}, Error: {e}")
                 # Add a minimal row for failed tasks
-                structured_data.append({
-                    'Task Title': task.get('title', 'Processing Error'),
-                    'Due Date': 'Error',
-                    'Due Time': 'Error',
-                    'Course Name': task.get('course_name', 'Unknown'),
-                    'Task Type': 'Error',
-                    'Status': 'Error'
-                })
+                columns['Task Title'].append(title or 'Processing Error')
+                columns['Due Date'].append('Error')
+                columns['Due Time'].append('Error')
+                columns['Course Name'].append(course_name or 'Unknown')
+                columns['Task Type'].append('Error')
+                columns['Status'].append('Error')
         
         # Create DataFrame and sort by due date
-        df = pd.DataFrame(structured_data)
+        df = pd.DataFrame(columns, copy=False)
         
         # Sort by due date (handle 'No Date' and 'Error' cases)
         def sort_key(date_str):
@@ -190,6 +308,9 @@ class CalendarGenerator:
         """
         Generate an Excel file in memory from the structured data
         
+        The workbook itself is built in the shared process pool so that
+        concurrent calendar generations are not serialized on the GIL.
+        
         Args:
             df (pd.DataFrame): Structured task data
             user_id (str): User identifier for personalization
@@ -197,86 +318,32 @@ class CalendarGenerator:
         Returns:
             io.BytesIO: Excel file in memory buffer
         """
+        records = df.to_dict('records')
+        columns = list(df.columns)
+        future = None
+        
         try:
-            # Create in-memory buffer
-            buffer = io.BytesIO()
-            
-            # Generate timestamp for the file
-            timestamp = datetime.now().strftime('%Y-%m-%d %I:%M %p')
-            
-            # Create Excel writer with openpyxl engine for better formatting
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                # Write main data to 'My Schedule' sheet
-                df.to_excel(writer, sheet_name='My Schedule', index=False)
-                
-                # Get the workbook and worksheet for formatting
-                workbook = writer.book
-                worksheet = writer.sheets['My Schedule']
-                
-                # Add title and metadata
-                worksheet.insert_rows(1, 3)
-                worksheet['A1'] = f'Easely Academic Calendar'
-                worksheet['A2'] = f'Generated: {timestamp}'
-                worksheet['A3'] = f'Total Tasks: {len(df)}'
-                
-                # Format header row (now row 4)
-                header_row = 4
-                for col_num, column_title in enumerate(df.columns, 1):
-                    cell = worksheet.cell(row=header_row, column=col_num)
-                    cell.value = column_title
-                    cell.font = workbook.create_font(bold=True)
-                    cell.fill = workbook.create_fill(
-                        fill_type='solid',
-                        start_color='E6E6FA'  # Light lavender
-                    )
-                
-                # Auto-adjust column widths
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    
-                    adjusted_width = min(max_length + 2, 50)  # Cap at 50 chars
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-                
-                # Add summary sheet if there are tasks
-                if len(df) > 0:
-                    summary_data = {
-                        'Metric': [
-                            'Total Tasks',
-                            'Overdue Tasks', 
-                            'Due Today/Tomorrow',
-                            'Canvas Assignments',
-                            'Personal Tasks'
-                        ],
-                        'Count': [
-                            len(df),
-                            len(df[df['Status'] == 'Overdue']),
-                            len(df[df['Status'] == 'Due Soon']),
-                            len(df[df['Task Type'] == 'Canvas Assignment']),
-                            len(df[df['Task Type'] == 'Personal Task'])
-                        ]
-                    }
-                    
-                    summary_df = pd.DataFrame(summary_data)
-                    summary_df.to_excel(writer, sheet_name='Summary', index=False)
-                    
-                    # Format summary sheet
-                    summary_sheet = writer.sheets['Summary']
-                    summary_sheet['A1'].font = workbook.create_font(bold=True)
-                    summary_sheet['B1'].font = workbook.create_font(bold=True)
+            pool = _get_xlsx_pool()
+            try:
+                future = pool.submit(_build_xlsx_bytes, records, columns, user_id)
+                file_bytes = future.result(timeout=XLSX_BUILD_TIMEOUT)
+            except BrokenProcessPool:
+                # A dead worker breaks the whole pool; drop it so the next call
+                # starts a fresh one, and build this workbook in-process
+                logger.warning(f"Excel worker pool broken, building file for user {user_id} in-process")
+                _get_xlsx_pool.cache_clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                file_bytes = _build_xlsx_bytes(records, columns, user_id)
             
-            # Reset buffer position to beginning
-            buffer.seek(0)
+            buffer = io.BytesIO(file_bytes)
             logger.info(f"Successfully generated Excel file for user: {user_id}")
             return buffer
             
+        except FuturesTimeoutError:
+            # Free the worker slot if the build has not started yet
+            future.cancel()
+            logger.error(f"Timed out generating Excel file for user {user_id} after {XLSX_BUILD_TIMEOUT}s")
+            raise CalendarGeneratorError("Failed to create calendar file")
         except Exception as e:
             logger.error(f"Failed to generate Excel file for user {user_id}: {e}")
             raise CalendarGeneratorError("Failed to create calendar file")
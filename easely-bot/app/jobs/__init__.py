@@ -26,28 +26,75 @@ via Render's Cron Job service on their own schedules.
 
 # Import shared utilities that jobs might need
 from typing import Dict, List, Optional
+import atexit
+import json
 import logging
+import logging.handlers
 import sys
 from datetime import datetime, timezone
 
+# python-json-logger is optional; fall back to a minimal stdlib JSON formatter
+try:
+    from pythonjsonlogger import jsonlogger
+except ImportError:
+    jsonlogger = None
+
+# Records buffered before a flush; ERROR and above flush immediately
+LOG_BUFFER_CAPACITY = 1000
+
+
+class _JsonFormatter(logging.Formatter):
+    """Format log records as one JSON object per line"""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'asctime': self.formatTime(record),
+            'name': record.name,
+            'levelname': record.levelname,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
 # Jobs are standalone scripts, but we can provide common utilities
 def setup_job_logging(job_name: str) -> logging.Logger:
     """
     Set up standardized logging for background jobs.
     
+    Records are written to stdout as JSON, buffered through a MemoryHandler
+    so a job emits them in blocks rather than one write per record. The
+    buffer is flushed on ERROR records and at interpreter exit.
+    
     Args:
         job_name: Name of the job (e.g., 'send_reminders')
         
     Returns:
         Configured logger instance
     """
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    root = logging.getLogger()
+    
+    # Only install the handlers once per process
+    if not any(isinstance(h, logging.handlers.MemoryHandler) for h in root.handlers):
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if jsonlogger is not None:
+            stream_handler.setFormatter(
+                jsonlogger.JsonFormatter('%(asctime)s %(name)s %(levelname)s %(message)s')
+            )
+        else:
+            stream_handler.setFormatter(_JsonFormatter())
+        
+        memory_handler = logging.handlers.MemoryHandler(
+            LOG_BUFFER_CAPACITY,
+            flushLevel=logging.ERROR,
+            target=stream_handler
+        )
+        root.addHandler(memory_handler)
+        root.setLevel(logging.INFO)
+        
+        # Drain the buffer on normal exit (and sys.exit from error handlers)
+        atexit.register(memory_handler.close)
+    
     return logging.getLogger(job_name)
 
 def job_error_handler(job_name: str, error: Exception):
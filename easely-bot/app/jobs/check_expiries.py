@@ -12,56 +12,21 @@ Schedule: Runs once daily at midnight (0 0 * * *) via Render Cron Job
 import logging
 import sys
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Final, List, Optional
 
-# Import Easely modules
-try:
-    from app.database.session import get_db_session
-    from app.database.queries import get_expired_premium_users, revert_user_to_free
-    from app.api.messenger_api import send_text_message
-    from config.settings import get_settings
-except ImportError as e:
-    print(f"Error importing required modules: {e}")
-    sys.exit(1)
+# Easely modules (SQLAlchemy, the Messenger client, settings) are imported
+# inside the functions that use them, so the job only pays for what it touches
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger('check_expiries')
 
-def send_expiry_notification(messenger_id: str) -> bool:
-    """
-    Send a polite notification to user about their premium expiration.
-    
-    Args:
-        messenger_id: The user's Messenger ID
-        
-    Returns:
-        bool: True if message was sent successfully, False otherwise
-    """
-    message = (
-        "Hi! Your Easely Premium access has expired. 😊\n\n"
-        "We hope you enjoyed the enhanced features! You can renew at any time "
-        "by visiting the menu and selecting 'Upgrade to Premium'.\n\n"
-        "Don't worry - your free Easely account is still active and you'll "
-        "continue receiving your daily assignment reminders!"
-    )
-    
-    try:
-        success = send_text_message(messenger_id, message)
-        if success:
-            logger.info(f"Sent expiry notification to user {messenger_id}")
-        else:
-            logger.warning(f"Failed to send expiry notification to user {messenger_id}")
-        return success
-    except Exception as e:
-        logger.error(f"Error sending expiry notification to user {messenger_id}: {e}")
-        return False
+# Notification text is constant, so it is built once at import
+_EXPIRY_MSG: Final[str] = (
+    "Hi! Your Easely Premium access has expired. 😊\n\n"
+    "We hope you enjoyed the enhanced features! You can renew at any time "
+    "by visiting the menu and selecting 'Upgrade to Premium'.\n\n"
+    "Don't worry - your free Easely account is still active and you'll "
+    "continue receiving your daily assignment reminders!"
+)
 
 def process_expired_users() -> int:
     """
@@ -70,45 +35,24 @@ def process_expired_users() -> int:
     Returns:
         int: Number of users successfully reverted to free tier
     """
-    db = get_db_session()
-    reverted_count = 0
+    from app.database.session import get_session_factory
+    from app.database.queries import bulk_revert_expired_premium
+    
+    db = get_session_factory()()
     notification_count = 0
     
     try:
-        # Get all expired premium users
-        logger.info("Querying for expired premium users...")
-        expired_users = get_expired_premium_users(db)
+        # Revert all expired premium users in a single statement
+        logger.info("Reverting expired premium users...")
+        reverted_users = bulk_revert_expired_premium(db)
+        db.commit()
         
-        if not expired_users:
+        if not reverted_users:
             logger.info("No expired premium users found.")
             return 0
         
-        logger.info(f"Found {len(expired_users)} expired premium users to process.")
-        
-        # Process each expired user
-        for user in expired_users:
-            try:
-                # Revert user to free tier
-                success = revert_user_to_free(db, user.id)
-                
-                if success:
-                    reverted_count += 1
-                    logger.info(f"Reverted user {user.id} (messenger_id: {user.messenger_id}) to free tier")
-                    
-                    # Send notification to user
-                    if send_expiry_notification(user.messenger_id):
-                        notification_count += 1
-                else:
-                    logger.error(f"Failed to revert user {user.id} to free tier")
-                    
-            except Exception as e:
-                logger.error(f"Error processing user {user.id}: {e}")
-                continue
-        
-        # Commit all changes
-        db.commit()
-        logger.info(f"Successfully processed {reverted_count} expired users")
-        logger.info(f"Sent expiry notifications to {notification_count} users")
+        reverted_count = len(reverted_users)
+        logger.info(f"Reverted {reverted_count} expired premium users to free tier")
         
     except Exception as e:
         logger.error(f"Error during expired users processing: {e}")
@@ -117,17 +61,38 @@ def process_expired_users() -> int:
     finally:
         db.close()
     
+    # Only load the Messenger client once there is someone to notify
+    from app.api.messenger_api import send_text_messages_batch
+    
+    # Notify users only after the downgrade has been committed; the batch
+    # sender splits the list into Graph API batch requests itself
+    try:
+        sent = send_text_messages_batch(
+            [(messenger_id, _EXPIRY_MSG) for _, messenger_id in reverted_users]
+        )
+        notification_count = sum(sent)
+    except Exception as e:
+        logger.error(f"Error sending expiry notifications: {e}")
+    
+    logger.info(f"Sent expiry notifications to {notification_count} users")
+    
     return reverted_count
 
 def main():
     """
     Main entry point for the check_expiries script.
     """
+    # Configure logging here rather than at import, so a parent process that
+    # imports this module keeps its own logging setup
+    from app.jobs import setup_job_logging
+    setup_job_logging('check_expiries')
+    
     logger.info("=== Easely Subscription Expiry Check Started ===")
     start_time = datetime.now(timezone.utc)
     
     try:
         # Load settings
+        from config.settings import get_settings
         settings = get_settings()
         logger.info("Settings loaded successfully")
         
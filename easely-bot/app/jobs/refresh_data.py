@@ -11,46 +11,55 @@ Schedule: Runs every 4 hours (0 */4 * * *) via Render Cron Job
 
 import logging
 import sys
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from datetime import datetime, timezone
-from typing import List, Dict, Set, Optional, Tuple
+from typing import Any, List, Dict, Set, Optional, Tuple, Union
 
-# Import Easely modules
+# Import Easely modules up front so a missing name stops the job at startup
+# instead of failing every user it syncs
 try:
-    from app.database.session import get_db_session
+    from app.database.session import get_session_factory
     from app.database.queries import (
+        count_active_users,
         get_active_users,
-        get_user_canvas_tasks,
-        get_user_courses,
-        create_task,
-        update_task,
-        delete_task,
-        create_course,
+        get_all_canvas_tasks_by_user,
+        get_all_courses_by_user,
+        bulk_sync_canvas_tasks,
+        bulk_upsert_courses,
         update_user_token_status
     )
     from app.api.canvas_api import (
-        get_assignments,
-        get_courses,
+        get_courses_and_assignments,
         CanvasAPIError,
-        InvalidTokenError
+        TokenInvalidError
     )
     from config.settings import get_settings
 except ImportError as e:
     print(f"Error importing required modules: {e}")
     sys.exit(1)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger('refresh_data')
 
+# Number of worker threads fetching Canvas data at the same time
+CANVAS_FETCH_WORKERS = 8
+
+# Number of users synced between database commits
+BATCH_COMMIT_SIZE = 100
+
 class SyncStats:
     """Track synchronization statistics"""
+    __slots__ = (
+        'users_processed',
+        'users_failed',
+        'assignments_added',
+        'assignments_updated',
+        'assignments_deleted',
+        'courses_added',
+        'courses_updated',
+        'tokens_invalidated'
+    )
+    
     def __init__(self):
         self.users_processed = 0
         self.users_failed = 0
@@ -60,89 +69,84 @@ class SyncStats:
         self.courses_added = 0
         self.courses_updated = 0
         self.tokens_invalidated = 0
+    
+    def merge(self, other: 'SyncStats') -> None:
+        """Add another SyncStats' counters into this one."""
+        for name in self.__slots__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
 
-def sync_user_assignments(db, user, canvas_assignments: List[Dict]) -> Tuple[int, int, int]:
+def sync_user_assignments(db, user, canvas_assignments: List, existing_tasks: List,
+                          course_ids: Dict[str, int]) -> Tuple[int, int, int]:
     """
     Sync assignments for a single user.
     
     Args:
         db: Database session
         user: User object
-        canvas_assignments: List of assignments from Canvas API
+        canvas_assignments: ParsedAssignment records from the Canvas client
+        existing_tasks: The user's Canvas tasks already stored in our database
+        course_ids: Maps Canvas course IDs to the user's Course IDs
         
     Returns:
         Tuple of (added_count, updated_count, deleted_count)
     """
-    added_count = updated_count = deleted_count = 0
+    to_insert = []
+    to_update = []
+    to_delete_ids = []
     
     try:
-        # Get existing Canvas tasks from our database
-        existing_tasks = get_user_canvas_tasks(db, user.id)
-        existing_task_ids = {task.canvas_assignment_id for task in existing_tasks if task.canvas_assignment_id}
+        # Index existing tasks by Canvas assignment ID once
+        existing_by_cid = {
+            task.canvas_assignment_id: task
+            for task in existing_tasks
+            if task.canvas_assignment_id
+        }
         
         # Convert Canvas assignments to a lookup dict
         canvas_assignment_dict = {
-            str(assignment['id']): assignment 
+            str(assignment.canvas_assignment_id): assignment
             for assignment in canvas_assignments
         }
-        canvas_assignment_ids = set(canvas_assignment_dict.keys())
         
-        # Find new assignments (in Canvas but not in our DB)
-        new_assignment_ids = canvas_assignment_ids - existing_task_ids
-        for assignment_id in new_assignment_ids:
-            assignment = canvas_assignment_dict[assignment_id]
+        # One pass over our tasks finds updates (due date changed) and
+        # deletions (in our DB but no longer in Canvas)
+        for assignment_id, existing_task in existing_by_cid.items():
+            assignment = canvas_assignment_dict.get(assignment_id)
             
-            # Create new task
-            task_data = {
-                'user_id': user.id,
-                'canvas_assignment_id': assignment_id,
-                'title': assignment.get('name', 'Untitled Assignment'),
-                'due_date': assignment.get('due_at'),
-                'course_id': assignment.get('course_id'),
-                'source': 'canvas_sync'
-            }
+            if assignment is None:
+                to_delete_ids.append(existing_task.id)
+                logger.debug("Deleting assignment: %s for user %s", existing_task.title, user.id)
+                continue
             
-            if create_task(db, task_data):
-                added_count += 1
-                logger.debug(f"Added new assignment: {assignment.get('name')} for user {user.id}")
+            if assignment.due_date != existing_task.due_date:
+                to_update.append({
+                    '_id': existing_task.id,
+                    'title': assignment.title,
+                    'due_date': assignment.due_date
+                })
+                logger.debug("Updating assignment: %s for user %s", assignment.title, user.id)
         
-        # Find assignments to update (check for due date changes)
-        existing_assignment_ids = canvas_assignment_ids & existing_task_ids
-        for assignment_id in existing_assignment_ids:
-            assignment = canvas_assignment_dict[assignment_id]
-            existing_task = next(
-                (task for task in existing_tasks if task.canvas_assignment_id == assignment_id),
-                None
-            )
+        # One pass over Canvas finds new assignments (in Canvas but not in our DB)
+        for assignment_id, assignment in canvas_assignment_dict.items():
+            if assignment_id in existing_by_cid:
+                continue
             
-            if existing_task:
-                # Check if due date has changed
-                canvas_due_date = assignment.get('due_at')
-                if canvas_due_date != existing_task.due_date.isoformat() if existing_task.due_date else None:
-                    update_data = {
-                        'title': assignment.get('name', existing_task.title),
-                        'due_date': canvas_due_date
-                    }
-                    
-                    if update_task(db, existing_task.id, update_data):
-                        updated_count += 1
-                        logger.debug(f"Updated assignment: {assignment.get('name')} for user {user.id}")
+            to_insert.append({
+                'canvas_assignment_id': assignment_id,
+                'course_id': course_ids.get(str(assignment.course_id)),
+                'title': assignment.title,
+                'due_date': assignment.due_date
+            })
+            logger.debug("Adding new assignment: %s for user %s", assignment.title, user.id)
         
-        # Find assignments to delete (in our DB but not in Canvas)
-        deleted_assignment_ids = existing_task_ids - canvas_assignment_ids
-        for task in existing_tasks:
-            if task.canvas_assignment_id in deleted_assignment_ids:
-                if delete_task(db, task.id):
-                    deleted_count += 1
-                    logger.debug(f"Deleted assignment: {task.title} for user {user.id}")
+        # Apply the whole diff in three statements
+        return bulk_sync_canvas_tasks(db, user.id, to_insert, to_update, to_delete_ids)
         
     except Exception as e:
         logger.error(f"Error syncing assignments for user {user.id}: {e}")
         raise
-    
-    return added_count, updated_count, deleted_count
 
-def sync_user_courses(db, user, canvas_courses: List[Dict]) -> Tuple[int, int]:
+def sync_user_courses(db, user, canvas_courses: List[Dict], existing_courses: List) -> Tuple[int, int, Dict[str, int]]:
     """
     Sync courses for a single user.
     
@@ -150,59 +154,113 @@ def sync_user_courses(db, user, canvas_courses: List[Dict]) -> Tuple[int, int]:
         db: Database session
         user: User object
         canvas_courses: List of courses from Canvas API
+        existing_courses: The user's courses already stored in our database
         
     Returns:
-        Tuple of (added_count, updated_count)
+        Tuple of (added_count, updated_count, course_ids), where course_ids
+        maps each Canvas course ID to its Course ID
     """
     added_count = updated_count = 0
     
     try:
-        # Get existing courses from our database
-        existing_courses = get_user_courses(db, user.id)
-        existing_course_ids = {str(course.canvas_course_id) for course in existing_courses}
+        # Index existing courses by Canvas course ID once
+        existing_by_id = {str(c.canvas_course_id): c for c in existing_courses}
         
-        # Process Canvas courses
+        # Keyed by Canvas course ID so a repeated course is written once
+        courses_data = {}
         for course in canvas_courses:
             course_id = str(course['id'])
-            course_name = course.get('name', 'Untitled Course')
+            if course_id in courses_data:
+                continue
             
-            if course_id not in existing_course_ids:
-                # Create new course
-                course_data = {
-                    'user_id': user.id,
-                    'canvas_course_id': course_id,
-                    'course_name': course_name
-                }
-                
-                if create_course(db, course_data):
-                    added_count += 1
-                    logger.debug(f"Added new course: {course_name} for user {user.id}")
-            else:
-                # Check if course name has changed
-                existing_course = next(
-                    (c for c in existing_courses if str(c.canvas_course_id) == course_id),
-                    None
-                )
-                
-                if existing_course and existing_course.course_name != course_name:
-                    # Note: You'll need to implement update_course function
-                    # For now, we'll skip course updates to keep it simple
-                    updated_count += 1
-                    logger.debug(f"Course name changed: {course_name} for user {user.id}")
+            course_name = course.get('name') or 'Untitled Course'
+            course_code = course.get('course_code') or None
+            existing_course = existing_by_id.get(course_id)
+            
+            if existing_course is None:
+                added_count += 1
+                logger.debug("Adding new course: %s for user %s", course_name, user.id)
+            elif existing_course.course_name != course_name or existing_course.course_code != course_code:
+                updated_count += 1
+                logger.debug("Updating course: %s for user %s", course_name, user.id)
+            
+            courses_data[course_id] = {
+                'canvas_course_id': course_id,
+                'course_name': course_name,
+                'course_code': course_code
+            }
+        
+        # Write every course in one statement
+        course_ids = bulk_upsert_courses(db, user.id, list(courses_data.values()))
         
     except Exception as e:
         logger.error(f"Error syncing courses for user {user.id}: {e}")
         raise
     
-    return added_count, updated_count
+    return added_count, updated_count, course_ids
 
-def sync_single_user(db, user) -> Dict:
+def fetch_user_canvas_data(user) -> Dict[str, Any]:
     """
-    Sync data for a single user with rate limiting consideration.
+    Fetch assignments and courses for a single user from Canvas.
+    
+    Both come back from one GraphQL query, which pages through each course's
+    assignments so the list is complete.
+    
+    Args:
+        user: User object with canvas_token
+        
+    Returns:
+        Dict with the user's 'assignments' and 'courses'
+    """
+    logger.debug("Fetching Canvas data for user %s", user.id)
+    canvas_courses, canvas_assignments = get_courses_and_assignments(user.canvas_token)
+    
+    return {
+        'assignments': canvas_assignments,
+        'courses': canvas_courses
+    }
+
+def fetch_all_canvas_data(executor: ThreadPoolExecutor, users: List) -> List[Union[Dict[str, Any], BaseException]]:
+    """
+    Fetch Canvas data for many users on a bounded thread pool.
+    
+    The Canvas client blocks on network I/O, which releases the GIL, so the
+    worker threads overlap their waits on Canvas.
+    
+    Args:
+        executor: Thread pool used for the Canvas requests
+        users: List of User objects with canvas_token
+        
+    Returns:
+        List aligned with users holding either the fetched data or the
+        exception raised while fetching it
+    """
+    results: List[Union[Dict[str, Any], BaseException]] = [None] * len(users)
+    futures = {
+        executor.submit(fetch_user_canvas_data, user): index
+        for index, user in enumerate(users)
+    }
+    
+    for future in as_completed(futures):
+        index = futures[future]
+        try:
+            results[index] = future.result()
+        except Exception as e:
+            results[index] = e
+    
+    return results
+
+def sync_single_user(db, user, canvas_data: Union[Dict[str, Any], BaseException],
+                     existing_tasks: List, existing_courses: List) -> Dict:
+    """
+    Apply the fetched Canvas data for a single user to the database.
     
     Args:
         db: Database session
         user: User object with canvas_token
+        canvas_data: Result of fetch_user_canvas_data, or the exception it raised
+        existing_tasks: The user's Canvas tasks already stored in our database
+        existing_courses: The user's courses already stored in our database
         
     Returns:
         Dict with sync results
@@ -218,29 +276,33 @@ def sync_single_user(db, user) -> Dict:
     }
     
     try:
-        logger.debug(f"Syncing data for user {user.id}")
+        logger.debug("Syncing data for user %s", user.id)
         
-        # Get assignments from Canvas
-        canvas_assignments = get_assignments(user.canvas_token)
+        # Surface fetch failures through the same error handling below
+        if isinstance(canvas_data, BaseException):
+            raise canvas_data
         
-        # Get courses from Canvas
-        canvas_courses = get_courses(user.canvas_token)
+        # Map Canvas course IDs to our Course IDs, starting from the stored courses
+        course_ids = {str(course.canvas_course_id): course.id for course in existing_courses}
+        
+        # Sync courses first so new assignments can point at their course
+        courses_result = sync_user_courses(db, user, canvas_data['courses'], existing_courses)
+        result['courses_added'] = courses_result[0]
+        result['courses_updated'] = courses_result[1]
+        course_ids.update(courses_result[2])
         
         # Sync assignments
-        assignments_result = sync_user_assignments(db, user, canvas_assignments)
+        assignments_result = sync_user_assignments(
+            db, user, canvas_data['assignments'], existing_tasks, course_ids
+        )
         result['assignments_added'] = assignments_result[0]
         result['assignments_updated'] = assignments_result[1]
         result['assignments_deleted'] = assignments_result[2]
         
-        # Sync courses
-        courses_result = sync_user_courses(db, user, canvas_courses)
-        result['courses_added'] = courses_result[0]
-        result['courses_updated'] = courses_result[1]
-        
         result['success'] = True
-        logger.debug(f"Successfully synced user {user.id}")
+        logger.debug("Successfully synced user %s", user.id)
         
-    except InvalidTokenError:
+    except TokenInvalidError:
         logger.warning(f"Invalid token for user {user.id}, marking as invalid")
         update_user_token_status(db, user.id, is_valid=False)
         result['error'] = 'invalid_token'
@@ -262,53 +324,87 @@ def process_data_refresh() -> SyncStats:
     Returns:
         SyncStats: Statistics about the sync process
     """
-    db = get_db_session()
+    db = get_session_factory()()
     stats = SyncStats()
     
     try:
-        # Get all active users with valid tokens
+        # Count active users up front; the users themselves are streamed
         logger.info("Querying for active users...")
-        active_users = get_active_users(db)
+        total_users = count_active_users(db)
         
-        if not active_users:
+        if not total_users:
             logger.info("No active users found.")
             return stats
         
-        logger.info(f"Found {len(active_users)} active users to sync.")
+        logger.info(f"Found {total_users} active users to sync.")
+        active_users = get_active_users(db, batch_size=BATCH_COMMIT_SIZE)
         
-        # Process each user with rate limiting
-        for i, user in enumerate(active_users):
-            try:
-                # Add delay between users to avoid rate limiting (except for first user)
-                if i > 0:
-                    time.sleep(2)  # 2-second delay between users
+        # Work through users in batches, committing once per batch
+        with ThreadPoolExecutor(max_workers=CANVAS_FETCH_WORKERS) as executor:
+            batch_start = 0
+            while True:
+                batch = list(islice(active_users, BATCH_COMMIT_SIZE))
+                if not batch:
+                    break
                 
-                # Sync user data
-                result = sync_single_user(db, user)
+                # Load the batch's existing tasks and courses in two queries
+                user_ids = [user.id for user in batch]
+                tasks_by_user = get_all_canvas_tasks_by_user(db, user_ids)
+                courses_by_user = get_all_courses_by_user(db, user_ids)
                 
-                if result['success']:
-                    stats.users_processed += 1
-                    stats.assignments_added += result['assignments_added']
-                    stats.assignments_updated += result['assignments_updated']
-                    stats.assignments_deleted += result['assignments_deleted']
-                    stats.courses_added += result['courses_added']
-                    stats.courses_updated += result['courses_updated']
-                else:
-                    stats.users_failed += 1
-                    if result['error'] == 'invalid_token':
-                        stats.tokens_invalidated += 1
+                # Fetch Canvas data for the batch concurrently
+                canvas_results = fetch_all_canvas_data(executor, batch)
                 
-                # Log progress every 50 users
-                if (i + 1) % 50 == 0:
-                    logger.info(f"Progress: {i + 1}/{len(active_users)} users processed")
+                # Apply the results on this thread so the session is never shared
+                batch_stats = SyncStats()
+                for i, (user, canvas_data) in enumerate(zip(batch, canvas_results), start=batch_start):
+                    # Savepoint per user so a failure only rewinds that user
+                    savepoint = db.begin_nested()
+                    
+                    try:
+                        # Sync user data
+                        result = sync_single_user(
+                            db,
+                            user,
+                            canvas_data,
+                            existing_tasks=tasks_by_user[user.id],
+                            existing_courses=courses_by_user[user.id]
+                        )
+                        
+                        if result['success']:
+                            savepoint.commit()
+                            batch_stats.users_processed += 1
+                            batch_stats.assignments_added += result['assignments_added']
+                            batch_stats.assignments_updated += result['assignments_updated']
+                            batch_stats.assignments_deleted += result['assignments_deleted']
+                            batch_stats.courses_added += result['courses_added']
+                            batch_stats.courses_updated += result['courses_updated']
+                        else:
+                            batch_stats.users_failed += 1
+                            if result['error'] == 'invalid_token':
+                                # Keep the token status change
+                                savepoint.commit()
+                                batch_stats.tokens_invalidated += 1
+                            else:
+                                savepoint.rollback()
+                        
+                        # Log progress every 50 users
+                        if (i + 1) % 50 == 0:
+                            logger.info(f"Progress: {i + 1}/{total_users} users processed")
+                        
+                    except Exception as e:
+                        logger.error(f"Critical error processing user {user.id}: {e}")
+                        if savepoint.is_active:
+                            savepoint.rollback()
+                        batch_stats.users_failed += 1
+                        continue
                 
-            except Exception as e:
-                logger.error(f"Critical error processing user {user.id}: {e}")
-                stats.users_failed += 1
-                continue
+                # Commit the batch so a later crash does not lose it
+                db.commit()
+                stats.merge(batch_stats)
+                logger.info(f"Committed batch of {len(batch)} users")
+                batch_start += len(batch)
         
-        # Commit all changes
-        db.commit()
         logger.info(f"Successfully processed {stats.users_processed} users")
         
     except Exception as e:
@@ -324,6 +420,11 @@ def main():
     """
     Main entry point for the refresh_data script.
     """
+    # Configure logging here rather than at import, so a parent process that
+    # imports this module keeps its own logging setup
+    from app.jobs import setup_job_logging
+    setup_job_logging('refresh_data')
+    
     logger.info("=== Easely Data Refresh Started ===")
     start_time = datetime.now(timezone.utc)
     
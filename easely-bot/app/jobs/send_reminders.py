@@ -9,19 +9,30 @@ subscription tier and reminder preferences.
 Schedule: Runs every hour at the top of the hour (0 * * * *) via Render Cron Job
 """
 
+import argparse
+import functools
 import logging
 import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Set, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+from operator import attrgetter
 
 # Import Easely modules
 try:
-    from app.database.session import get_db_session
+    from app.database.session import get_session_factory
+    from app.database.models import SubscriptionTier
     from app.database.queries import (
-        get_tasks_needing_reminders,
-        update_task_last_reminder,
-        get_user_reminder_preferences
+        get_reminder_matches,
+        get_open_tasks_due_between,
+        bulk_mark_reminders_sent,
+        claim_reminders,
+        count_users_with_reminder_claims,
+        release_reminder_claims
     )
     from app.api.messenger_api import send_text_message
     from config.settings import get_settings
@@ -29,17 +40,18 @@ except ImportError as e:
     print(f"Error importing required modules: {e}")
     sys.exit(1)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger('send_reminders')
 
-@dataclass
+# Maximum number of reminder messages in flight at the same time
+REMINDER_SEND_CONCURRENCY = 32
+
+# English month names used when formatting due dates
+MONTHS = (
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+)
+
+@dataclass(frozen=True, slots=True)
 class ReminderWindow:
     """Defines a reminder window with timing and message template"""
     name: str
@@ -50,7 +62,7 @@ class ReminderWindow:
 # Define reminder windows for different subscription tiers
 FREE_TIER_WINDOWS = [
     ReminderWindow(
-        name="24_hour",
+        name="1_day",
         hours_before=24,
         message_template="🔔 Reminder: '{title}' is due in 24 hours!\n\nDue: {due_date}",
         emoji="🔔"
@@ -71,7 +83,7 @@ PREMIUM_TIER_WINDOWS = [
         emoji="⚠️"
     ),
     ReminderWindow(
-        name="24_hours",
+        name="1_day",
         hours_before=24,
         message_template="🔔 Reminder: '{title}' is due tomorrow!\n\nDue: {due_date}\n\nFinal stretch! 💪",
         emoji="🔔"
@@ -96,16 +108,45 @@ PREMIUM_TIER_WINDOWS = [
     )
 ]
 
+# Reminder windows per subscription tier, and the same windows keyed by name
+WINDOWS_BY_TIER = {
+    SubscriptionTier.FREE: FREE_TIER_WINDOWS,
+    SubscriptionTier.PREMIUM: PREMIUM_TIER_WINDOWS
+}
+WINDOW_LOOKUP = {
+    tier: {window.name: window for window in windows}
+    for tier, windows in WINDOWS_BY_TIER.items()
+}
+
+@dataclass(slots=True)
 class ReminderStats:
     """Track reminder sending statistics"""
-    def __init__(self):
-        self.total_tasks_checked = 0
-        self.reminders_sent = 0
-        self.reminders_failed = 0
-        self.users_notified = 0
-        self.free_tier_reminders = 0
-        self.premium_tier_reminders = 0
-        self.reminder_breakdown = {}  # window_name -> count
+    total_tasks_checked: int = 0
+    reminders_sent: int = 0
+    reminders_failed: int = 0
+    messages_sent: int = 0
+    users_notified: int = 0
+    free_tier_reminders: int = 0
+    premium_tier_reminders: int = 0
+    reminder_breakdown: Counter = field(default_factory=Counter)  # window_name -> count
+    
+    def merge(self, other: 'ReminderStats') -> None:
+        """Add another ReminderStats' counters into this one."""
+        for stats_field in fields(self):
+            name = stats_field.name
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+@functools.lru_cache(maxsize=8192)
+def _format_due_date_cached(due_date: datetime) -> str:
+    """Format a timezone-aware due date; cached since many tasks share due times."""
+    # Same output as strftime("%B %d, %Y at %I:%M %p UTC") without the
+    # locale-aware lookups
+    hour12 = due_date.hour % 12 or 12
+    ampm = "AM" if due_date.hour < 12 else "PM"
+    return (
+        f"{MONTHS[due_date.month - 1]} {due_date.day:02d}, {due_date.year} "
+        f"at {hour12:02d}:{due_date.minute:02d} {ampm} UTC"
+    )
 
 def format_due_date(due_date: datetime) -> str:
     """
@@ -118,12 +159,13 @@ def format_due_date(due_date: datetime) -> str:
         Formatted date string
     """
     try:
-        # Convert to local time if needed (assuming UTC stored in DB)
+        # Convert to local time if needed (assuming UTC stored in DB);
+        # normalizing first keeps the cache keys consistent
         if due_date.tzinfo is None:
             due_date = due_date.replace(tzinfo=timezone.utc)
         
         # Format as readable string
-        return due_date.strftime("%B %d, %Y at %I:%M %p UTC")
+        return _format_due_date_cached(due_date)
     except Exception as e:
         logger.warning(f"Error formatting due date {due_date}: {e}")
         return str(due_date)
@@ -142,14 +184,15 @@ def create_reminder_message(task, window: ReminderWindow) -> str:
     try:
         formatted_date = format_due_date(task.due_date)
         
-        message = window.message_template.format(
-            title=task.title,
-            due_date=formatted_date
-        )
+        message = window.message_template.format_map({
+            'title': task.title,
+            'due_date': formatted_date
+        })
         
         # Add course context if available
-        if hasattr(task, 'course_name') and task.course_name:
-            message += f"\nCourse: {task.course_name}"
+        course_name = getattr(task, 'course_name', None)
+        if course_name:
+            message += f"\nCourse: {course_name}"
         
         return message
         
@@ -158,144 +201,265 @@ def create_reminder_message(task, window: ReminderWindow) -> str:
         # Fallback message
         return f"{window.emoji} Reminder: '{task.title}' is due soon!"
 
-def should_send_reminder(task, window: ReminderWindow, current_time: datetime) -> bool:
+def match_reminders_in_python(tasks: List[object], current_time: datetime,
+                              tolerance: timedelta = timedelta(minutes=30)) -> List[Tuple[object, str]]:
     """
-    Determine if a reminder should be sent for a task at a specific window.
+    Match tasks to reminder windows in Python.
+    
+    Fallback for when get_reminder_matches cannot run. Tasks are sorted by
+    due date once; each window's due date range is then found with bisect,
+    so only the tasks inside a window are visited.
     
     Args:
-        task: Task object from database
-        window: ReminderWindow to check
+        tasks: Open tasks with their users loaded
         current_time: Current datetime
+        tolerance: How far either side of the exact reminder time still matches
         
     Returns:
-        Boolean indicating if reminder should be sent
+        List of (task, window_name) tuples
     """
-    try:
-        # Calculate target reminder time
-        target_reminder_time = task.due_date - timedelta(hours=window.hours_before)
-        
-        # Check if we're within the reminder window (±30 minutes for flexibility)
-        time_diff = abs((current_time - target_reminder_time).total_seconds())
-        within_window = time_diff <= 1800  # 30 minutes in seconds
-        
-        if not within_window:
-            return False
-        
-        # Check if we've already sent this type of reminder
-        last_reminder_field = f"last_{window.name}_reminder"
-        if hasattr(task, last_reminder_field):
-            last_sent = getattr(task, last_reminder_field)
-            if last_sent and last_sent >= target_reminder_time - timedelta(hours=1):
-                return False  # Already sent within the last hour
+    tasks = sorted(tasks, key=attrgetter('due_date'))
+    due_dates = [task.due_date for task in tasks]
+    matches = []
+    
+    for tier, windows in WINDOWS_BY_TIER.items():
+        for window in windows:
+            target = current_time + timedelta(hours=window.hours_before)
+            low = bisect_left(due_dates, target - tolerance)
+            high = bisect_right(due_dates, target + tolerance)
+            sent_flag = f"reminder_{window.name}_sent"
+            
+            for task in tasks[low:high]:
+                if task.user.subscription_tier == tier and not getattr(task, sent_flag, False):
+                    matches.append((task, window.name))
+    
+    return matches
+
+def reminder_target_bucket(task, window: ReminderWindow) -> int:
+    """
+    Get the hour bucket a reminder targets, used as its dedup key.
+    
+    Args:
+        task: Task object from database
+        window: ReminderWindow being sent
         
-        return True
+    Returns:
+        Target reminder time in whole hours since the epoch
+    """
+    target_reminder_time = task.due_date - timedelta(hours=window.hours_before)
+    return int(target_reminder_time.timestamp()) // 3600
+
+def create_digest_message(matches: List[Tuple[object, ReminderWindow]]) -> str:
+    """
+    Combine all of a user's due reminders into one message.
+    
+    A single reminder keeps its full window message; several are listed
+    most urgent first under one header.
+    
+    Args:
+        matches: (task, window) pairs for one user
         
-    except Exception as e:
-        logger.error(f"Error checking reminder timing for task {task.id}: {e}")
-        return False
+    Returns:
+        Formatted digest message
+    """
+    if len(matches) == 1:
+        task, window = matches[0]
+        return create_reminder_message(task, window)
+    
+    lines = [f"📋 You have {len(matches)} upcoming deadlines:"]
+    for task, window in sorted(matches, key=lambda match: match[1].hours_before):
+        lines.append(f"{window.emoji} '{task.title}' - due {format_due_date(task.due_date)}")
+    
+    return "\n\n".join(lines)
 
-def send_reminder_to_user(task, window: ReminderWindow) -> bool:
+def send_digest_to_user(messenger_id: str, matches: List[Tuple[object, ReminderWindow]]) -> bool:
     """
-    Send a reminder message to a user.
+    Send one digest message covering all of a user's due reminders.
     
     Args:
-        task: Task object with user information
-        window: ReminderWindow object
+        messenger_id: The user's Messenger ID
+        matches: (task, window) pairs for this user
         
     Returns:
         Boolean indicating if message was sent successfully
     """
     try:
-        message = create_reminder_message(task, window)
+        message = create_digest_message(matches)
         
-        success = send_text_message(task.user.messenger_id, message)
+        success = send_text_message(messenger_id, message)
         
         if success:
-            logger.info(f"Sent {window.name} reminder for task '{task.title}' to user {task.user_id}")
+            logger.info(f"Sent {len(matches)} reminder(s) to user {matches[0][0].user_id}")
         else:
-            logger.warning(f"Failed to send {window.name} reminder for task {task.id}")
+            logger.warning(f"Failed to send {len(matches)} reminder(s) to user {matches[0][0].user_id}")
         
         return success
         
-    except Exception as e:
-        logger.error(f"Error sending reminder for task {task.id}: {e}")
+    except Exception:
+        logger.exception(f"Error sending reminders to user {matches[0][0].user_id}")
         return False
 
-def process_reminders() -> ReminderStats:
+def send_reminders_concurrently(digests: List[Tuple[str, List[Tuple[object, ReminderWindow]]]]) -> List[bool]:
+    """
+    Send many digests concurrently with bounded fan-out.
+    
+    The Messenger client is blocking I/O, so sends run on a thread pool
+    sized to REMINDER_SEND_CONCURRENCY. No database work happens in the
+    workers; results are applied on the calling thread.
+    
+    Args:
+        digests: (messenger_id, matches) pairs, one per user
+        
+    Returns:
+        List of success flags aligned with digests
+    """
+    if not digests:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=REMINDER_SEND_CONCURRENCY) as executor:
+        return list(executor.map(lambda digest: send_digest_to_user(*digest), digests))
+
+def process_reminders(dry_run: bool = False) -> ReminderStats:
     """
     Main function to process and send all due reminders.
     
+    Args:
+        dry_run: Run the query and matching pipeline and build the messages,
+            but send nothing and roll back all database writes
+    
     Returns:
         ReminderStats: Statistics about the reminder process
     """
-    db = get_db_session()
+    db = get_session_factory()()
     stats = ReminderStats()
     current_time = datetime.now(timezone.utc)
+    stage_ns = {}  # stage name -> elapsed nanoseconds
     
     try:
         logger.info("Querying for tasks needing reminders...")
-        
-        # Get all tasks that might need reminders
-        tasks_needing_reminders = get_tasks_needing_reminders(db, current_time)
-        
-        if not tasks_needing_reminders:
+        stage_start = time.perf_counter_ns()
+        
+        # Get every (task, window) pair whose reminder is due now; the
+        # window matching happens in the database
+        matches = get_reminder_matches(db, WINDOWS_BY_TIER, current_time)
+        
+        if matches is None:
+            # Fall back to fetching every task that could fall in any window
+            # and matching in Python
+            logger.warning("SQL reminder matching failed, matching in Python instead")
+            db.rollback()
+            hours = [window.hours_before for windows in WINDOWS_BY_TIER.values() for window in windows]
+            tasks = get_open_tasks_due_between(
+                db,
+                current_time + timedelta(hours=min(hours), minutes=-30),
+                current_time + timedelta(hours=max(hours), minutes=30)
+            )
+            matches = match_reminders_in_python(tasks, current_time)
+        
+        stage_ns['match'] = time.perf_counter_ns() - stage_start
+        
+        if not matches:
             logger.info("No tasks found needing reminders.")
             return stats
         
-        logger.info(f"Found {len(tasks_needing_reminders)} tasks to check for reminders.")
-        stats.total_tasks_checked = len(tasks_needing_reminders)
+        logger.info(f"Found {len(matches)} reminder matches.")
+        stats.total_tasks_checked = len(matches)
         
-        notified_users = set()
+        candidates = []
+        queued_task_ids = set()
+        sent_task_ids = {}  # window_name -> task IDs, flushed in one UPDATE per window
         
-        # Process each task
-        for task in tasks_needing_reminders:
-            try:
-                # Determine subscription tier and available windows
-                if task.user.subscription_tier == 'premium':
-                    available_windows = PREMIUM_TIER_WINDOWS
-                else:
-                    available_windows = FREE_TIER_WINDOWS
-                
-                # Check each reminder window
-                for window in available_windows:
-                    if should_send_reminder(task, window, current_time):
-                        # Send reminder
-                        success = send_reminder_to_user(task, window)
-                        
-                        if success:
-                            stats.reminders_sent += 1
-                            notified_users.add(task.user_id)
-                            
-                            # Track by subscription tier
-                            if task.user.subscription_tier == 'premium':
-                                stats.premium_tier_reminders += 1
-                            else:
-                                stats.free_tier_reminders += 1
-                            
-                            # Track by reminder type
-                            if window.name not in stats.reminder_breakdown:
-                                stats.reminder_breakdown[window.name] = 0
-                            stats.reminder_breakdown[window.name] += 1
-                            
-                            # Update last reminder timestamp in database
-                            update_task_last_reminder(db, task.id, window.name, current_time)
-                            
-                        else:
-                            stats.reminders_failed += 1
-                        
-                        # Break after sending one reminder per task per run
-                        break
-                
-            except Exception as e:
-                logger.error(f"Error processing task {task.id}: {e}")
-                stats.reminders_failed += 1
+        # Queue at most one reminder per task per run
+        for task, window_name in matches:
+            if task.id in queued_task_ids:
                 continue
+            queued_task_ids.add(task.id)
+            
+            window = WINDOW_LOOKUP[task.user.subscription_tier][window_name]
+            candidates.append((task, window, reminder_target_bucket(task, window)))
+        
+        # Claim the reminders in one INSERT; ones already in the sent-log are dropped
+        stage_start = time.perf_counter_ns()
+        claim_ids = claim_reminders(
+            db, [(task.id, window.name, bucket) for task, window, bucket in candidates]
+        )
+        if dry_run:
+            db.flush()
+        else:
+            db.commit()
+        stage_ns['claim'] = time.perf_counter_ns() - stage_start
+        
+        pending = [
+            (task, window) for task, window, _ in candidates
+            if (task.id, window.name) in claim_ids
+        ]
+        if len(pending) < len(candidates):
+            logger.info(f"Skipping {len(candidates) - len(pending)} reminders already sent")
+        
+        # Group the claimed reminders into one digest per user
+        by_user = {}
+        for task, window in pending:
+            by_user.setdefault(task.user.messenger_id, []).append((task, window))
+        digests = list(by_user.items())
+        
+        # Send all digests concurrently; a dry run only builds the messages
+        stage_start = time.perf_counter_ns()
+        if dry_run:
+            results = [bool(create_digest_message(matches)) for _, matches in digests]
+        else:
+            results = send_reminders_concurrently(digests)
+        stage_ns['send'] = time.perf_counter_ns() - stage_start
+        failed_claim_ids = []
+        
+        # Errors are handled per user inside send_digest_to_user, so the
+        # tallying below runs without any per-task exception handling
+        for (messenger_id, matches), success in zip(digests, results):
+            if not success:
+                stats.reminders_failed += len(matches)
+                failed_claim_ids.extend(claim_ids[(task.id, window.name)] for task, window in matches)
+                continue
+            
+            stats.messages_sent += 1
+            stats.reminders_sent += len(matches)
+            user = matches[0][0].user
+            
+            # Track by subscription tier
+            if user.subscription_tier == SubscriptionTier.PREMIUM:
+                stats.premium_tier_reminders += len(matches)
+            else:
+                stats.free_tier_reminders += len(matches)
+            
+            for task, window in matches:
+                # Track by reminder type
+                stats.reminder_breakdown[window.name] += 1
+                
+                # Record the send; written to the database after the loop
+                sent_task_ids.setdefault(window.name, []).append(task.id)
+        
+        # Record all sent reminders, one UPDATE per window, release the claims
+        # of failed sends so the next run retries them, and commit
+        stage_start = time.perf_counter_ns()
+        bulk_mark_reminders_sent(db, sent_task_ids)
+        release_reminder_claims(db, failed_claim_ids)
+        
+        # Count the users behind this run's own successful claims, so neither
+        # clock skew nor an overlapping run can change the number
+        failed = set(failed_claim_ids)
+        stats.users_notified = count_users_with_reminder_claims(
+            db, [claim_id for claim_id in claim_ids.values() if claim_id not in failed]
+        )
+        if dry_run:
+            db.rollback()
+        else:
+            db.commit()
+        stage_ns['record'] = time.perf_counter_ns() - stage_start
         
-        stats.users_notified = len(notified_users)
-        
-        # Commit database updates
-        db.commit()
-        logger.info(f"Successfully sent {stats.reminders_sent} reminders")
+        if dry_run:
+            logger.info(f"Dry run: would have sent {stats.reminders_sent} reminders")
+            for stage, elapsed in stage_ns.items():
+                logger.info(f"  {stage}: {elapsed / 1e6:.1f} ms")
+        else:
+            logger.info(f"Successfully sent {stats.reminders_sent} reminders")
         
     except Exception as e:
         logger.error(f"Error during reminder processing: {e}")
@@ -310,7 +474,22 @@ def main():
     """
     Main entry point for the send_reminders script.
     """
+    # Importing this module from tests or a scheduler must not add handlers;
+    # setup_job_logging only installs them once per process
+    from app.jobs import setup_job_logging
+    setup_job_logging('send_reminders')
+    
+    parser = argparse.ArgumentParser(description="Send due assignment reminders")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="match and build reminders without sending them or writing to the database"
+    )
+    args = parser.parse_args()
+    
     logger.info("=== Easely Reminder Service Started ===")
+    if args.dry_run:
+        logger.info("Dry run: no messages will be sent")
     start_time = datetime.now(timezone.utc)
     
     try:
@@ -319,7 +498,7 @@ def main():
         logger.info("Settings loaded successfully")
         
         # Process reminders
-        stats = process_reminders()
+        stats = process_reminders(dry_run=args.dry_run)
         
         # Calculate execution time
         end_time = datetime.now(timezone.utc)
@@ -330,6 +509,7 @@ def main():
         logger.info(f"Tasks checked: {stats.total_tasks_checked}")
         logger.info(f"Reminders sent successfully: {stats.reminders_sent}")
         logger.info(f"Reminders failed: {stats.reminders_failed}")
+        logger.info(f"Messages sent: {stats.messages_sent}")
         logger.info(f"Unique users notified: {stats.users_notified}")
         logger.info(f"Free tier reminders: {stats.free_tier_reminders}")
         logger.info(f"Premium tier reminders: {stats.premium_tier_reminders}")
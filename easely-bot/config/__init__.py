@@ -26,6 +26,10 @@ more maintainable and the import system more predictable.
 # Optional: Make frequently used settings available at package level
 try:
     from .settings import (
+        # Cached settings accessor
+        Settings,
+        get_settings,
+        
         # Core application identity
         BOT_NAME,
         BOT_VERSION,
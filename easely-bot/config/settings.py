@@ -13,7 +13,9 @@ Core Responsibilities:
 - Provide type-safe configuration access
 """
 
+import functools
 import os
+from dataclasses import dataclass
 from typing import Optional
 
 
@@ -44,20 +46,124 @@ def get_env_var(key: str, default: Optional[str] = None, required: bool = False)
     return value
 
 
+# =============================================================================
+# Core Settings (loaded and validated once per process)
+# =============================================================================
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Environment-backed settings that the app and background jobs depend on"""
+    database_uri: str
+    db_pool_size: int
+    db_max_overflow: int
+    db_pool_timeout: int
+    messenger_access_token: str
+    facebook_verify_token: str
+    facebook_api_version: str
+    canvas_api_base_url: str
+    canvas_api_rate_limit: int
+    canvas_api_timeout: int
+    premium_price_usd: float
+    subscription_duration_days: int
+    encryption_key: str
+    secret_key: str
+    log_level: str
+    debug_mode: bool
+    environment: str
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Load the core settings from the environment.
+    
+    The result is cached, so environment parsing and validation only run
+    on the first call in a process.
+    
+    Returns:
+        Settings: The validated settings
+        
+    Raises:
+        ValueError: If a required variable is missing or a value is invalid
+    """
+    settings = Settings(
+        database_uri=get_env_var("DATABASE_URL", required=True),
+        db_pool_size=int(get_env_var("DB_POOL_SIZE", "10")),
+        db_max_overflow=int(get_env_var("DB_MAX_OVERFLOW", "20")),
+        db_pool_timeout=int(get_env_var("DB_POOL_TIMEOUT", "30")),
+        messenger_access_token=get_env_var("MESSENGER_ACCESS_TOKEN", required=True),
+        facebook_verify_token=get_env_var("FACEBOOK_VERIFY_TOKEN", required=True),
+        facebook_api_version=get_env_var("FACEBOOK_API_VERSION", "v18.0"),
+        canvas_api_base_url=get_env_var("CANVAS_API_BASE_URL", "https://canvas.instructure.com"),
+        canvas_api_rate_limit=int(get_env_var("CANVAS_API_RATE_LIMIT", "100")),
+        canvas_api_timeout=int(get_env_var("CANVAS_API_TIMEOUT", "30")),
+        premium_price_usd=float(get_env_var("PREMIUM_PRICE_USD", "5.00")),
+        subscription_duration_days=int(get_env_var("SUBSCRIPTION_DURATION_DAYS", "30")),
+        encryption_key=get_env_var("ENCRYPTION_KEY", required=True),
+        secret_key=get_env_var("SECRET_KEY", required=True),
+        log_level=get_env_var("LOG_LEVEL", "INFO").upper(),
+        debug_mode=get_env_var("DEBUG_MODE", "false").lower() == "true",
+        environment=get_env_var("ENVIRONMENT", "development").lower()
+    )
+    validate_configuration(settings)
+    return settings
+
+
+# =============================================================================
+# Validation
+# =============================================================================
+
+def validate_configuration(settings: Optional[Settings] = None):
+    """
+    Validate critical configuration values on application startup.
+    
+    get_settings() runs this once when the settings are first loaded.
+    
+    Args:
+        settings: Settings to validate (defaults to get_settings())
+    
+    Raises:
+        ValueError: If any critical configuration is invalid
+    """
+    if settings is None:
+        settings = get_settings()
+    
+    errors = []
+    
+    # Validate encryption key length
+    if len(settings.encryption_key) != 44:  # Base64 encoded 32-byte key
+        errors.append("ENCRYPTION_KEY must be a valid 32-byte base64-encoded string")
+    
+    # Validate database URI format
+    if not settings.database_uri.startswith(('postgresql://', 'postgres://')):
+        errors.append("DATABASE_URI must be a valid PostgreSQL connection string")
+    
+    # Validate messenger token format
+    if not settings.messenger_access_token.startswith('EAA'):
+        errors.append("MESSENGER_ACCESS_TOKEN appears to be invalid format")
+    
+    # Validate premium settings
+    if settings.premium_price_usd <= 0:
+        errors.append("PREMIUM_PRICE_USD must be greater than 0")
+    
+    if settings.subscription_duration_days <= 0:
+        errors.append("SUBSCRIPTION_DURATION_DAYS must be greater than 0")
+    
+    if errors:
+        raise ValueError(f"Configuration validation failed:\n" + "\n".join(f"- {error}" for error in errors))
+
+
 # =============================================================================
 # Database Configuration
 # =============================================================================
 
 # PostgreSQL connection string - critical for all database operations
-DATABASE_URI = get_env_var(
-    "DATABASE_URL", 
-    required=True
-)
+DATABASE_URI = get_settings().database_uri
 
 # Database connection pool settings
-DB_POOL_SIZE = int(get_env_var("DB_POOL_SIZE", "10"))
-DB_MAX_OVERFLOW = int(get_env_var("DB_MAX_OVERFLOW", "20"))
-DB_POOL_TIMEOUT = int(get_env_var("DB_POOL_TIMEOUT", "30"))
+DB_POOL_SIZE = get_settings().db_pool_size
+DB_MAX_OVERFLOW = get_settings().db_max_overflow
+DB_POOL_TIMEOUT = get_settings().db_pool_timeout
 
 
 # =============================================================================
@@ -65,19 +171,13 @@ DB_POOL_TIMEOUT = int(get_env_var("DB_POOL_TIMEOUT", "30"))
 # =============================================================================
 
 # Page Access Token for sending messages via Messenger API
-MESSENGER_ACCESS_TOKEN = get_env_var(
-    "MESSENGER_ACCESS_TOKEN",
-    required=True
-)
+MESSENGER_ACCESS_TOKEN = get_settings().messenger_access_token
 
 # Webhook verification token for Facebook security
-FACEBOOK_VERIFY_TOKEN = get_env_var(
-    "FACEBOOK_VERIFY_TOKEN",
-    required=True
-)
+FACEBOOK_VERIFY_TOKEN = get_settings().facebook_verify_token
 
 # Facebook API version and base URL
-FACEBOOK_API_VERSION = get_env_var("FACEBOOK_API_VERSION", "v18.0")
+FACEBOOK_API_VERSION = get_settings().facebook_api_version
 MESSENGER_API_BASE_URL = f"https://graph.facebook.com/{FACEBOOK_API_VERSION}/me/messages"
 
 
@@ -86,14 +186,11 @@ MESSENGER_API_BASE_URL = f"https://graph.facebook.com/{FACEBOOK_API_VERSION}/me/
 # =============================================================================
 
 # Base URL for Canvas API calls
-CANVAS_API_BASE_URL = get_env_var(
-    "CANVAS_API_BASE_URL", 
-    "https://canvas.instructure.com"
-)
+CANVAS_API_BASE_URL = get_settings().canvas_api_base_url
 
 # API rate limiting settings
-CANVAS_API_RATE_LIMIT = int(get_env_var("CANVAS_API_RATE_LIMIT", "100"))
-CANVAS_API_TIMEOUT = int(get_env_var("CANVAS_API_TIMEOUT", "30"))
+CANVAS_API_RATE_LIMIT = get_settings().canvas_api_rate_limit
+CANVAS_API_TIMEOUT = get_settings().canvas_api_timeout
 
 # Canvas API endpoints (relative to base URL)
 CANVAS_ASSIGNMENTS_ENDPOINT = "/api/v1/courses/{course_id}/assignments"
@@ -112,8 +209,8 @@ KOFI_USERNAME = get_env_var("KOFI_USERNAME")  # Your Ko-fi username
 PAYMENT_URL = f"{KOFI_BASE_URL}/{KOFI_USERNAME}" if KOFI_USERNAME else None
 
 # Subscription pricing and duration
-PREMIUM_PRICE_USD = float(get_env_var("PREMIUM_PRICE_USD", "5.00"))
-SUBSCRIPTION_DURATION_DAYS = int(get_env_var("SUBSCRIPTION_DURATION_DAYS", "30"))
+PREMIUM_PRICE_USD = get_settings().premium_price_usd
+SUBSCRIPTION_DURATION_DAYS = get_settings().subscription_duration_days
 
 # Free tier limitations
 FREE_TIER_TASK_LIMIT = int(get_env_var("FREE_TIER_TASK_LIMIT", "5"))
@@ -136,16 +233,10 @@ AI_MAX_TOKENS = int(get_env_var("AI_MAX_TOKENS", "500"))
 # =============================================================================
 
 # Encryption key for Canvas tokens (must be 32 bytes for Fernet)
-ENCRYPTION_KEY = get_env_var(
-    "ENCRYPTION_KEY",
-    required=True
-)
+ENCRYPTION_KEY = get_settings().encryption_key
 
 # Session security
-SECRET_KEY = get_env_var(
-    "SECRET_KEY",
-    required=True
-)
+SECRET_KEY = get_settings().secret_key
 
 # HTTPS enforcement in production
 FORCE_HTTPS = get_env_var("FORCE_HTTPS", "false").lower() == "true"
@@ -203,10 +294,10 @@ SYNC_BATCH_DELAY_SECONDS = int(get_env_var("SYNC_BATCH_DELAY", "2"))
 # =============================================================================
 
 # Logging level
-LOG_LEVEL = get_env_var("LOG_LEVEL", "INFO").upper()
+LOG_LEVEL = get_settings().log_level
 
 # Enable detailed logging for debugging
-DEBUG_MODE = get_env_var("DEBUG_MODE", "false").lower() == "true"
+DEBUG_MODE = get_settings().debug_mode
 
 # External monitoring service
 SENTRY_DSN = get_env_var("SENTRY_DSN")  # Optional error tracking
@@ -217,7 +308,7 @@ SENTRY_DSN = get_env_var("SENTRY_DSN")  # Optional error tracking
 # =============================================================================
 
 # Detect deployment environment
-ENVIRONMENT = get_env_var("ENVIRONMENT", "development").lower()
+ENVIRONMENT = get_settings().environment
 IS_PRODUCTION = ENVIRONMENT == "production"
 IS_DEVELOPMENT = ENVIRONMENT == "development"
 
@@ -262,47 +353,6 @@ MAINTENANCE_MESSAGE = get_env_var(
 )
 
 
-# =============================================================================
-# Validation on Import
-# =============================================================================
-
-def validate_configuration():
-    """
-    Validate critical configuration values on application startup.
-    
-    Raises:
-        ValueError: If any critical configuration is invalid
-    """
-    errors = []
-    
-    # Validate encryption key length
-    if len(ENCRYPTION_KEY.encode()) != 44:  # Base64 encoded 32-byte key
-        errors.append("ENCRYPTION_KEY must be a valid 32-byte base64-encoded string")
-    
-    # Validate database URI format
-    if not DATABASE_URI.startswith(('postgresql://', 'postgres://')):
-        errors.append("DATABASE_URI must be a valid PostgreSQL connection string")
-    
-    # Validate messenger token format
-    if not MESSENGER_ACCESS_TOKEN.startswith('EAA'):
-        errors.append("MESSENGER_ACCESS_TOKEN appears to be invalid format")
-    
-    # Validate premium settings
-    if PREMIUM_PRICE_USD <= 0:
-        errors.append("PREMIUM_PRICE_USD must be greater than 0")
-    
-    if SUBSCRIPTION_DURATION_DAYS <= 0:
-        errors.append("SUBSCRIPTION_DURATION_DAYS must be greater than 0")
-    
-    if errors:
-        raise ValueError(f"Configuration validation failed:\n" + "\n".join(f"- {error}" for error in errors))
-
-
-# Auto-validate configuration when module is imported
-if __name__ != "__main__":
-    validate_configuration()
-
-
 # =============================================================================
 # Configuration Summary (for debugging)
 # =============================================================================
@@ -0,0 +1,174 @@
+"""
+Shared fixtures for the app/core/event_handler.py test suites.
+
+The event handler tests are the "Master Chess Simulator" - the decision-making logic and
+orchestration of the event handler without any external dependencies. All external modules
+are mocked to test pure logic and conversation flow.
+
+Key Testing Philosophy:
+- Mock everything external (database, APIs)
+- Test conversation flows and decision logic
+- Verify correct function calls in correct order
+- Assert proper data passing between modules
+- Test all user interaction scenarios
+
+The suites share no state beyond the read-only data in tests/event_handler/data.py, so
+they can run in parallel with pytest-xdist (pytest -n auto). The clock is frozen for this
+package only.
+"""
+
+from unittest.mock import Mock
+import pytest
+from types import SimpleNamespace
+
+from tests.event_handler.data import (
+    NOW,
+    freeze_time,
+    MESSENGER_ID,
+    SAMPLE_TOKEN,
+    MOCK_USER,
+    MOCK_USER_FREE,
+    MOCK_USER_PREMIUM,
+    FLOW_USER,
+    MOCK_COURSES,
+    EXPIRED_USER,
+    ACTIVE_PREMIUM_USER
+)
+
+# Import the handler while this conftest loads, before the event handler tests are
+# collected, so it is loaded once per process (and once per xdist worker). The
+# conftest lives in this package so the other suites never import it.
+from app.core import event_handler  # noqa: E402
+
+
+@pytest.hookimpl(hookwrapper=True, trylast=True)
+def pytest_runtest_call(item):
+    """
+    Run the event handler tests without output capture.
+    
+    They only touch mocks, so there is nothing to capture. Hooks from this conftest
+    apply to tests in this package only, and trylast nests this wrapper inside the
+    capture plugin's, after it resumes capturing for the call phase.
+    """
+    capture_manager = item.config.pluginmanager.getplugin("capturemanager")
+    if capture_manager is None:
+        yield
+        return
+    
+    with capture_manager.global_and_fixture_disabled():
+        yield
+
+
+@pytest.fixture(autouse=True, scope="package")
+def frozen_now():
+    """Freeze utcnow() at NOW so due-date maths in the handler is deterministic"""
+    if freeze_time is None:
+        yield
+        return
+    
+    with freeze_time(NOW):
+        yield
+
+
+@pytest.fixture(scope="session")
+def handler():
+    """One EventHandler for the whole session; dependencies are patched at module level"""
+    return event_handler.EventHandler()
+
+
+def _new_deps():
+    """Fresh mocks for the handler's queries, messenger_api and canvas_api modules"""
+    # Plain Mock: module stand-ins need no magic methods configured
+    return SimpleNamespace(queries=Mock(), messenger=Mock(), canvas=Mock())
+
+
+def _reset_deps(deps):
+    """Clear calls, return values and side effects from the dependency mocks"""
+    for mock in (deps.queries, deps.messenger, deps.canvas):
+        mock.reset_mock(return_value=True, side_effect=True)
+
+
+def _install_deps(patcher, deps):
+    """Point the handler's dependency modules at the mocks"""
+    patcher.setattr(event_handler, "queries", deps.queries)
+    patcher.setattr(event_handler, "messenger_api", deps.messenger)
+    patcher.setattr(event_handler, "canvas_api", deps.canvas)
+
+
+@pytest.fixture
+def patched_deps(monkeypatch):
+    """Swap the handler's queries, messenger_api and canvas_api modules for new mocks"""
+    deps = _new_deps()
+    _install_deps(monkeypatch, deps)
+    return deps
+
+
+@pytest.fixture(scope="class")
+def _class_deps():
+    """One set of dependency mocks patched in for a whole test class"""
+    deps = _new_deps()
+    with pytest.MonkeyPatch.context() as patcher:
+        _install_deps(patcher, deps)
+        yield deps
+
+
+@pytest.fixture
+def patched_deps_class(_class_deps):
+    """Class-wide patched_deps: the same mocks, reset before each test instead of re-patched"""
+    _reset_deps(_class_deps)
+    return _class_deps
+
+
+# The data fixtures hand out read-only constants, so one value serves the whole session
+@pytest.fixture(scope="session")
+def messenger_id():
+    """Messenger ID shared by every simulated user"""
+    return MESSENGER_ID
+
+
+@pytest.fixture(scope="session")
+def sample_token():
+    """Canvas token submitted during onboarding"""
+    return SAMPLE_TOKEN
+
+
+@pytest.fixture(scope="session")
+def mock_user():
+    """Returning free-tier user with a linked Canvas account"""
+    return MOCK_USER
+
+
+@pytest.fixture(scope="session")
+def mock_user_free():
+    """Free-tier user used by the task management tests"""
+    return MOCK_USER_FREE
+
+
+@pytest.fixture(scope="session")
+def mock_user_premium():
+    """Premium counterpart of mock_user_free"""
+    return MOCK_USER_PREMIUM
+
+
+@pytest.fixture(scope="session")
+def flow_user():
+    """Premium user walking through the task creation conversation"""
+    return FLOW_USER
+
+
+@pytest.fixture(scope="session")
+def mock_courses():
+    """Courses offered when assigning a manual task"""
+    return MOCK_COURSES
+
+
+@pytest.fixture(scope="session")
+def expired_user():
+    """Premium user whose subscription ran out yesterday"""
+    return EXPIRED_USER
+
+
+@pytest.fixture(scope="session")
+def active_premium_user():
+    """Premium user with time left on the subscription"""
+    return ACTIVE_PREMIUM_USER
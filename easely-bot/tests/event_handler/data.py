@@ -0,0 +1,129 @@
+"""
+Shared test data and call helpers for the app/core/event_handler.py test suites.
+
+Every value is read-only so the split test files can share it safely, both
+in one process and across pytest-xdist workers. Copy with dict() before
+mutating.
+"""
+
+import inspect
+from datetime import datetime, timedelta
+from types import MappingProxyType
+
+try:
+    from freezegun import freeze_time
+except ImportError:
+    freeze_time = None
+
+
+# With freezegun installed the clock is pinned to NOW for the whole session;
+# without it the data is anchored to the live clock
+NOW = datetime(2025, 8, 27, 12, 0) if freeze_time else datetime.utcnow()
+
+MESSENGER_ID = "test_user_123"
+SAMPLE_TOKEN = "canvas_token_abc123"
+
+MOCK_USER = MappingProxyType({
+    "id": 1,
+    "messenger_id": MESSENGER_ID,
+    "canvas_token": "valid_token_456",
+    "canvas_user_id": 67890,
+    "subscription_tier": "free",
+    "subscription_expiry_date": NOW + timedelta(days=10)
+})
+
+MOCK_USER_FREE = MappingProxyType({
+    "id": 2,
+    "messenger_id": MESSENGER_ID,
+    "canvas_token": "token_789",
+    "canvas_user_id": 11111,
+    "subscription_tier": "free",
+    "subscription_expiry_date": NOW + timedelta(days=5)
+})
+
+MOCK_USER_PREMIUM = MappingProxyType({
+    **MOCK_USER_FREE,
+    "subscription_tier": "premium"
+})
+
+FLOW_USER = MappingProxyType({
+    "id": 3,
+    "messenger_id": MESSENGER_ID,
+    "canvas_token": "token_999",
+    "canvas_user_id": 22222,
+    "subscription_tier": "premium"
+})
+
+MOCK_COURSES = (
+    MappingProxyType({"id": 201, "name": "Advanced Physics"}),
+    MappingProxyType({"id": 202, "name": "Computer Science 101"})
+)
+
+EXPIRED_USER = MappingProxyType({
+    "id": 5,
+    "messenger_id": MESSENGER_ID,
+    "subscription_tier": "premium",
+    "subscription_expiry_date": NOW - timedelta(days=1)
+})
+
+ACTIVE_PREMIUM_USER = MappingProxyType({
+    "id": 5,
+    "messenger_id": MESSENGER_ID,
+    "subscription_tier": "premium",
+    "subscription_expiry_date": NOW + timedelta(days=15)
+})
+
+
+
+def frozen_event(kind, value, sender_id=MESSENGER_ID):
+    """Read-only Messenger webhook event: a 'message' with text or a 'postback' with payload"""
+    field = "text" if kind == "message" else "payload"
+    return MappingProxyType({
+        "sender": MappingProxyType({"id": sender_id}),
+        kind: MappingProxyType({field: value})
+    })
+
+
+EV_HI = frozen_event("message", "Hi")
+EV_CONSENT_AGREED = frozen_event("postback", "CONSENT_AGREED")
+EV_TOKEN = frozen_event("message", SAMPLE_TOKEN)
+EV_INVALID_TOKEN = frozen_event("message", "invalid_token_123")
+EV_GET_TASKS_TODAY = frozen_event("postback", "GET_TASKS_TODAY")
+EV_GET_OVERDUE_TASKS = frozen_event("postback", "GET_OVERDUE_TASKS")
+EV_ADD_NEW_TASK = frozen_event("postback", "ADD_NEW_TASK")
+EV_TASK_TITLE = frozen_event("message", "Complete Final Project")
+EV_SELECT_COURSE_201 = frozen_event("postback", "SELECT_COURSE_201")
+EV_ACTIVATE = frozen_event("message", "ACTIVATE")
+
+def _call_arguments(mock_method, options_key=None):
+    """Arguments of the last call to a mocked messenger function, by parameter name
+    
+    Positional and keyword calls both land under the parameter's name. A
+    mock without a usable spec accepts anything, so its calls are bound to the
+    messenger shape (user_id, text[, options_key]) instead.
+    """
+    try:
+        signature = inspect.signature(mock_method)
+    except (TypeError, ValueError):
+        signature = None
+    if signature is None or any(param.kind is param.VAR_POSITIONAL for param in signature.parameters.values()):
+        names = ('user_id', 'text') + ((options_key,) if options_key else ())
+        signature = inspect.Signature([
+            *(inspect.Parameter(name, inspect.Parameter.POSITIONAL_OR_KEYWORD, default=None) for name in names),
+            inspect.Parameter('args', inspect.Parameter.VAR_POSITIONAL),
+            inspect.Parameter('kwargs', inspect.Parameter.VAR_KEYWORD)
+        ])
+    call = mock_method.call_args
+    return signature.bind(*call.args, **call.kwargs).arguments
+
+
+def sent_text(mock_method):
+    """Text argument of the last call to a mocked messenger function"""
+    return _call_arguments(mock_method).get('text') or ''
+
+
+def sent_content(mock_method, options_key):
+    """Text plus the button or quick reply titles of the last call to a mocked messenger function"""
+    arguments = _call_arguments(mock_method, options_key)
+    titles = (option.get('title', '') for option in arguments.get(options_key) or ())
+    return '\n'.join((arguments.get('text') or '', *titles))
@@ -0,0 +1,119 @@
+"""
+Test suite for app/core/event_handler.py: new user onboarding flow.
+
+All external modules are mocked through the patched_deps fixture in conftest.py.
+"""
+
+from tests.event_handler.data import (
+    sent_text,
+    sent_content,
+    EV_CONSENT_AGREED,
+    EV_HI,
+    EV_INVALID_TOKEN,
+    EV_TOKEN
+)
+
+
+# ============================================================================
+# Onboarding
+# ============================================================================
+
+def test_new_user_first_contact(patched_deps, handler, messenger_id):
+    """Test: New user sends first message - should get consent request"""
+    # Arrange
+    patched_deps.queries.get_user_by_messenger_id.return_value = None  # New user
+    
+    # Act
+    handler.handle(EV_HI)
+    
+    # Assert
+    patched_deps.queries.get_user_by_messenger_id.assert_called_once_with(messenger_id)
+    patched_deps.messenger.send_button_template.assert_called_once()
+    
+    # Verify the consent buttons were sent
+    consent_text = sent_content(patched_deps.messenger.send_button_template, 'buttons')
+    assert "✅ I Agree, Let's Go!" in consent_text
+    assert "📜 Privacy Policy" in consent_text
+    assert "⚖ Terms of Use" in consent_text
+    
+    # Verify no Canvas API calls were made yet
+    patched_deps.canvas.validate_token.assert_not_called()
+
+
+def test_user_consent_agreement(patched_deps, handler):
+    """Test: User agrees to terms - should get token request"""
+    # Arrange
+    patched_deps.queries.get_user_by_messenger_id.return_value = None
+    
+    # Act
+    handler.handle(EV_CONSENT_AGREED)
+    
+    # Assert
+    patched_deps.messenger.send_quick_reply.assert_called_once()
+    
+    # Verify token request message with options
+    token_request = sent_content(patched_deps.messenger.send_quick_reply, 'quick_replies')
+    assert "Canvas Access Token" in token_request
+    assert "Show me how" in token_request
+
+
+def test_valid_token_submission_success(patched_deps, handler, messenger_id, sample_token):
+    """Test: User submits valid token - should trigger initial sync"""
+    # Arrange
+    patched_deps.queries.get_user_by_messenger_id.return_value = None
+    patched_deps.canvas.configure_mock(**{
+        "validate_token.return_value": {"id": 12345, "name": "John Doe"},
+        "get_assignments.return_value": [
+            {"title": "Math Homework", "due_at": "2025-08-28T23:59:00Z"},
+            {"title": "History Essay", "due_at": "2025-08-30T23:59:00Z"}
+        ],
+        "get_courses.return_value": [
+            {"id": 101, "name": "Mathematics 101"},
+            {"id": 102, "name": "History 201"}
+        ]
+    })
+    
+    # Act
+    handler.handle(EV_TOKEN)
+    
+    # Assert - Verify the complete onboarding sequence
+    patched_deps.canvas.validate_token.assert_called_once_with(sample_token)
+    patched_deps.queries.create_user.assert_called_once_with(
+        messenger_id=messenger_id,
+        canvas_token=sample_token,
+        canvas_user_id=12345
+    )
+    
+    # Verify initial sync was triggered
+    patched_deps.canvas.get_assignments.assert_called_once_with(sample_token, 12345)
+    patched_deps.canvas.get_courses.assert_called_once_with(sample_token, 12345)
+    patched_deps.queries.bulk_insert_tasks.assert_called_once()
+    patched_deps.queries.bulk_insert_courses.assert_called_once()
+    
+    # Verify success message with assignments preview
+    patched_deps.messenger.send_text.assert_called()
+    success_message = sent_text(patched_deps.messenger.send_text)
+    assert "Welcome to Easely, John!" in success_message
+    assert "Math Homework" in success_message
+    assert "History Essay" in success_message
+
+
+def test_invalid_token_submission(patched_deps, handler):
+    """Test: User submits invalid token - should get error message"""
+    # Arrange
+    patched_deps.queries.get_user_by_messenger_id.return_value = None
+    patched_deps.canvas.validate_token.side_effect = Exception("Invalid token")
+    
+    # Act
+    handler.handle(EV_INVALID_TOKEN)
+    
+    # Assert
+    patched_deps.canvas.validate_token.assert_called_once_with("invalid_token_123")
+    patched_deps.messenger.send_text.assert_called()
+    
+    error_message = sent_text(patched_deps.messenger.send_text)
+    assert "invalid" in error_message.lower()
+    assert "tutorial" in error_message.lower()
+    
+    # Verify no user was created
+    patched_deps.queries.create_user.assert_not_called()
@@ -0,0 +1,165 @@
+"""
+Test suite for app/core/event_handler.py: returning user interactions and error handling.
+
+All external modules are mocked through the patched_deps fixture in conftest.py.
+"""
+
+import pytest
+from datetime import timedelta
+
+from tests.event_handler.data import (
+    NOW,
+    sent_text,
+    sent_content,
+    frozen_event,
+    EV_GET_OVERDUE_TASKS,
+    EV_GET_TASKS_TODAY,
+    EV_HI
+)
+
+# Options every returning user should see in the task management menu
+_MENU_KEYWORDS = (
+    "🔥 Due Today",
+    "⏰ Due This Week",
+    "❗ Show Overdue",
+    "🗓 View All Upcoming",
+    "＋ Add New Task"
+)
+
+
+# ============================================================================
+# Returning users
+# ============================================================================
+
+def test_returning_user_greeting_shows_menu(patched_deps, handler, mock_user):
+    """Test: Returning user says 'Hi' - should get task management menu"""
+    # Arrange
+    patched_deps.queries.get_user_by_messenger_id.return_value = mock_user
+    
+    # Act
+    handler.handle(EV_HI)
+    
+    # Assert
+    patched_deps.messenger.send_quick_reply.assert_called_once()
+    
+    # Verify menu options are present
+    menu_text = sent_content(patched_deps.messenger.send_quick_reply, 'quick_replies')
+    missing = [keyword for keyword in _MENU_KEYWORDS if keyword not in menu_text]
+    assert not missing, missing
+
+
+@pytest.mark.parametrize("event,query_attr,tasks,expected_substrings", [
+    (
+        EV_GET_TASKS_TODAY,
+        "get_tasks_due_in_next_24_hours",
+        [
+            {
+                "title": "Submit Lab Report",
+                "due_date": NOW + timedelta(hours=6),
+                "course_name": "Chemistry 101"
+            },
+            {
+                "title": "Math Quiz",
+                "due_date": NOW + timedelta(hours=12),
+                "course_name": "Mathematics 101"
+            }
+        ],
+        ["Due Today", "Submit Lab Report", "Math Quiz", "Chemistry 101"]
+    ),
+    (
+        EV_GET_OVERDUE_TASKS,
+        "get_overdue_tasks",
+        [
+            {
+                "title": "Late Assignment",
+                "due_date": NOW - timedelta(days=2),
+                "course_name": "English 101"
+            }
+        ],
+        ["Overdue", "Late Assignment"]
+    ),
+], ids=["due_today", "overdue"])
+def test_task_filters(patched_deps, handler, mock_user, event, query_attr, tasks,
+                      expected_substrings):
+    """Test: User picks a task filter - should list the matching tasks"""
+    # Arrange
+    patched_deps.queries.configure_mock(**{
+        "get_user_by_messenger_id.return_value": mock_user,
+        f"{query_attr}.return_value": tasks
+    })
+    
+    # Act
+    handler.handle(event)
+    
+    # Assert
+    getattr(patched_deps.queries, query_attr).assert_called_once_with(1)  # user_id
+    patched_deps.messenger.send_text.assert_called()
+    
+    response_text = sent_text(patched_deps.messenger.send_text)
+    for expected in expected_substrings:
+        assert expected in response_text
+
+
+def test_due_today_filter_no_tasks(patched_deps, handler, mock_user):
+    """Test: User requests 'Due Today' with no tasks - should show encouraging message"""
+    # Arrange
+    patched_deps.queries.configure_mock(**{
+        "get_user_by_messenger_id.return_value": mock_user,
+        "get_tasks_due_in_next_24_hours.return_value": []
+    })
+    
+    # Act
+    handler.handle(EV_GET_TASKS_TODAY)
+    
+    # Assert
+    patched_deps.queries.get_tasks_due_in_next_24_hours.assert_called_once_with(1)
+    patched_deps.messenger.send_text.assert_called()
+    
+    response_text = sent_text(patched_deps.messenger.send_text)
+    assert "Nothing due today" in response_text.lower()
+    assert "great job" in response_text.lower()
+
+
+# ============================================================================
+# Error handling
+# ============================================================================
+
+# Sync failures hit a linked user, so every error case looks that user up first
+_SYNC_ERROR_USER = {
+    "id": 4,
+    "messenger_id": "sync_error_user",
+    "canvas_token": "failing_token",
+    "canvas_user_id": 33333
+}
+
+
+@pytest.mark.parametrize("mock_path,exc,event,expected_substrings", [
+    (
+        "queries.get_user_by_messenger_id",
+        Exception("Database connection failed"),
+        frozen_event("message", "Hi", sender_id="error_user_123"),
+        ["temporarily unavailable"]
+    ),
+    (
+        "canvas.get_assignments",
+        Exception("Canvas API rate limit exceeded"),
+        frozen_event("postback", "GET_TASKS_TODAY", sender_id="sync_error_user"),
+        ["trouble connecting", "canvas"]
+    ),
+], ids=["database", "canvas_sync"])
+def test_error_paths(patched_deps, handler, mock_path, exc, event, expected_substrings):
+    """Test: A dependency fails - should send a user-friendly error without technical details"""
+    # Arrange
+    patched_deps.queries.get_user_by_messenger_id.return_value = _SYNC_ERROR_USER
+    dependency, attr = mock_path.split(".", 1)
+    getattr(getattr(patched_deps, dependency), attr).side_effect = exc
+    
+    # Act
+    handler.handle(event)
+    
+    # Assert
+    patched_deps.messenger.send_text.assert_called()
+    error_message = sent_text(patched_deps.messenger.send_text)
+    for expected in expected_substrings:
+        assert expected in error_message.lower()
+    assert str(exc) not in error_message  # No technical details
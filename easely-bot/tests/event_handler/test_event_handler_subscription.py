@@ -0,0 +1,53 @@
+"""
+Test suite for app/core/event_handler.py: subscription tier logic and premium features.
+
+All external modules are mocked through the patched_deps fixture in conftest.py.
+"""
+
+from unittest.mock import ANY
+
+from tests.event_handler.data import sent_text, EV_ACTIVATE, EV_ADD_NEW_TASK
+
+
+# ============================================================================
+# Subscription logic
+# ============================================================================
+
+def test_expired_premium_user_gets_downgraded(patched_deps, handler, expired_user):
+    """Test: Expired premium user should be treated as free tier"""
+    # Arrange
+    patched_deps.queries.get_user_by_messenger_id.return_value = expired_user
+    
+    # Act
+    handler.handle(EV_ADD_NEW_TASK)
+    
+    # Assert
+    # Should check monthly limit even though user has 'premium' tier (because expired)
+    patched_deps.queries.get_user_monthly_task_count.assert_called_once()
+    
+    # Should update user tier to 'free' in database
+    patched_deps.queries.update_user_subscription_tier.assert_called_once_with(5, "free")
+
+
+def test_premium_activation_flow(patched_deps, handler, messenger_id):
+    """Test: User activates premium with 'ACTIVATE' command"""
+    # Arrange
+    free_user = {
+        "id": 6,
+        "messenger_id": messenger_id,
+        "subscription_tier": "free"
+    }
+    patched_deps.queries.get_user_by_messenger_id.return_value = free_user
+    
+    # Act
+    handler.handle(EV_ACTIVATE)
+    
+    # Assert
+    patched_deps.queries.update_user_subscription_tier.assert_called_once_with(
+        6, "premium", ANY  # Any expiry date
+    )
+    patched_deps.messenger.send_text.assert_called()
+    
+    activation_message = sent_text(patched_deps.messenger.send_text)
+    assert "Premium activated" in activation_message
+    assert "unlimited" in activation_message.lower()
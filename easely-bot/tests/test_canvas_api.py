@@ -9,10 +9,15 @@ that our parsing and data transformation logic works correctly.
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timezone
+from types import SimpleNamespace
+import io
 import json
 
+import requests
+
 # Import the module we're testing
 # Note: Adjust import path based on actual project structure
+from app.api import canvas_api
 from app.api.canvas_api import (
     get_assignments,
     get_courses, 
@@ -22,6 +27,38 @@ from app.api.canvas_api import (
 )
 
 
+@pytest.fixture
+def make_response():
+    """Factory for lightweight Canvas responses with the body as bytes and as a stream."""
+    def _make(payload, status_code=200):
+        body = json.dumps(payload).encode()
+        response = SimpleNamespace(
+            status_code=status_code,
+            content=body,
+            raw=io.BytesIO(body),
+            text=body.decode(),
+            links={},
+            headers={},
+            close=lambda: None
+        )
+        
+        # Mirror requests: raise HTTPError for 4xx/5xx responses
+        def raise_for_status():
+            if status_code >= 400:
+                raise requests.exceptions.HTTPError(f"{status_code} Error", response=response)
+        
+        response.raise_for_status = raise_for_status
+        return response
+    return _make
+
+
+@pytest.fixture(autouse=True)
+def canvas_base_url(monkeypatch):
+    """Pin the Canvas base URL so requests skip domain detection, and start with empty caches."""
+    monkeypatch.setattr(canvas_api, "CANVAS_API_BASE", "https://canvas.university.edu")
+    canvas_api._clear_caches()
+
+
 class TestCanvasAPIDataParsing:
     """Test suite for Canvas API data parsing functions."""
     
@@ -121,23 +158,19 @@ class TestCanvasAPIDataParsing:
             }
         }
 
-    @patch('app.api.canvas_api.requests.get')
-    def test_get_assignments_successful_parsing(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_get_assignments_successful_parsing(self, mock_request, make_response):
         """Test that get_assignments correctly parses Canvas API response."""
         # Mock the API response
-        mock_response = Mock()
-        mock_response.json.return_value = self.sample_assignments_response
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response(self.sample_assignments_response)
         
         # Call the function
         result = get_assignments("fake_token", "fake_base_url")
         
         # Verify the API was called correctly
-        mock_get.assert_called_once()
-        call_args = mock_get.call_args
-        assert "assignments" in call_args[0][0]  # URL contains 'assignments'
+        mock_request.assert_called_once()
+        call_args = mock_request.call_args
+        assert "assignments" in call_args[1]['url']  # URL contains 'assignments'
         assert call_args[1]['headers']['Authorization'] == 'Bearer fake_token'
         
         # Verify the parsed result
@@ -146,50 +179,42 @@ class TestCanvasAPIDataParsing:
         
         # Test first assignment parsing
         first_assignment = result[0]
-        assert first_assignment['canvas_assignment_id'] == 12345
-        assert first_assignment['title'] == "Final Essay - Literature Analysis"
-        assert first_assignment['due_date'] == datetime(2024, 12, 15, 23, 59, tzinfo=timezone.utc)
-        assert first_assignment['course_id'] == 1001
-        assert first_assignment['source'] == 'canvas'
+        assert first_assignment.canvas_assignment_id == 12345
+        assert first_assignment.title == "Final Essay - Literature Analysis"
+        assert first_assignment.due_date == datetime(2024, 12, 15, 23, 59, tzinfo=timezone.utc)
+        assert first_assignment.course_id == 1001
+        assert first_assignment.source == 'canvas'
         
         # Test second assignment parsing
         second_assignment = result[1]
-        assert second_assignment['canvas_assignment_id'] == 12346
-        assert second_assignment['title'] == "Math Quiz 3"
-        assert second_assignment['due_date'] == datetime(2024, 12, 10, 14, 30, tzinfo=timezone.utc)
-        assert second_assignment['course_id'] == 1002
-        assert second_assignment['source'] == 'canvas'
-
-    @patch('app.api.canvas_api.requests.get')
-    def test_get_assignments_filters_no_due_date(self, mock_get):
+        assert second_assignment.canvas_assignment_id == 12346
+        assert second_assignment.title == "Math Quiz 3"
+        assert second_assignment.due_date == datetime(2024, 12, 10, 14, 30, tzinfo=timezone.utc)
+        assert second_assignment.course_id == 1002
+        assert second_assignment.source == 'canvas'
+
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_get_assignments_filters_no_due_date(self, mock_request, make_response):
         """Test that assignments without due dates are filtered out."""
         # Mock response with assignment that has no due_at
-        mock_response = Mock()
-        mock_response.json.return_value = [self.sample_assignments_response[2]]  # No due date assignment
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response([self.sample_assignments_response[2]])  # No due date assignment
         
         result = get_assignments("fake_token", "fake_base_url")
         
         # Should return empty list since assignment has no due_at
         assert result == []
 
-    @patch('app.api.canvas_api.requests.get')
-    def test_get_courses_successful_parsing(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_get_courses_successful_parsing(self, mock_request, make_response):
         """Test that get_courses correctly parses Canvas API response."""
-        mock_response = Mock()
-        mock_response.json.return_value = self.sample_courses_response
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response(self.sample_courses_response)
         
         result = get_courses("fake_token", "fake_base_url")
         
         # Verify API call
-        mock_get.assert_called_once()
-        call_args = mock_get.call_args
-        assert "courses" in call_args[0][0]
+        mock_request.assert_called_once()
+        call_args = mock_request.call_args
+        assert "courses" in call_args[1]['url']
         assert call_args[1]['headers']['Authorization'] == 'Bearer fake_token'
         
         # Verify parsing (should exclude concluded courses)
@@ -204,46 +229,35 @@ class TestCanvasAPIDataParsing:
         assert second_course['canvas_course_id'] == 1002
         assert second_course['course_name'] == "Calculus I"
 
-    @patch('app.api.canvas_api.requests.get')
-    def test_get_courses_filters_concluded(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_get_courses_filters_concluded(self, mock_request, make_response):
         """Test that concluded courses are filtered out."""
-        mock_response = Mock()
-        mock_response.json.return_value = [self.sample_courses_response[2]]  # Concluded course only
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response([self.sample_courses_response[2]])  # Concluded course only
         
         result = get_courses("fake_token", "fake_base_url")
         
         assert result == []
 
-    @patch('app.api.canvas_api.requests.get')
-    def test_validate_token_success(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_validate_token_success(self, mock_request, make_response):
         """Test successful token validation."""
-        mock_response = Mock()
-        mock_response.json.return_value = self.sample_user_profile_response
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response(self.sample_user_profile_response)
         
         result = validate_token("valid_token", "fake_base_url")
         
         # Verify API call
-        mock_get.assert_called_once()
-        call_args = mock_get.call_args
-        assert "users/self" in call_args[0][0]
+        mock_request.assert_called_once()
+        call_args = mock_request.call_args
+        assert "users/self" in call_args[1]['url']
         assert call_args[1]['headers']['Authorization'] == 'Bearer valid_token'
         
         # Verify result
         assert result is True
 
-    @patch('app.api.canvas_api.requests.get')
-    def test_validate_token_failure(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_validate_token_failure(self, mock_request, make_response):
         """Test token validation failure."""
-        mock_response = Mock()
-        mock_response.status_code = 401
-        mock_response.raise_for_status.side_effect = Exception("Unauthorized")
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response({"errors": [{"message": "Invalid access token."}]}, status_code=401)
         
         result = validate_token("invalid_token", "fake_base_url")
         
@@ -277,14 +291,10 @@ class TestCanvasAPIEventCreation:
             "updated_at": "2024-12-01T10:00:00Z"
         }
 
-    @patch('app.api.canvas_api.requests.post')
-    def test_create_calendar_event_success(self, mock_post):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_create_calendar_event_success(self, mock_request, make_response):
         """Test successful calendar event creation."""
-        mock_response = Mock()
-        mock_response.json.return_value = self.sample_canvas_event_response
-        mock_response.status_code = 201
-        mock_response.raise_for_status.return_value = None
-        mock_post.return_value = mock_response
+        mock_request.return_value = make_response(self.sample_canvas_event_response, status_code=201)
         
         result = create_calendar_event(
             token="fake_token",
@@ -293,34 +303,34 @@ class TestCanvasAPIEventCreation:
         )
         
         # Verify API call was made correctly
-        mock_post.assert_called_once()
-        call_args = mock_post.call_args
+        mock_request.assert_called_once()
+        call_args = mock_request.call_args
         
         # Check URL
-        assert "calendar_events" in call_args[0][0]
+        assert "calendar_events" in call_args[1]['url']
         
         # Check headers
         assert call_args[1]['headers']['Authorization'] == 'Bearer fake_token'
         assert call_args[1]['headers']['Content-Type'] == 'application/json'
         
-        # Check request payload
-        payload = json.loads(call_args[1]['data'])
-        assert payload['calendar_event']['title'] == 'Study Session for Finals'
-        assert payload['calendar_event']['start_at'] == '2024-12-20T15:30:00Z'
-        assert payload['calendar_event']['description'] == 'Group study session in library'
-        assert payload['calendar_event']['context_code'] == 'course_1001'
+        # Check request payload, comparing the serialized bytes directly
+        expected_payload = {
+            'calendar_event': {
+                'title': 'Study Session for Finals',
+                'start_at': '2024-12-20T15:30:00Z',
+                'description': 'Group study session in library',
+                'context_code': 'course_1001'
+            }
+        }
+        assert call_args[1]['data'] == canvas_api._json_dumps(expected_payload)
         
         # Check return value
         assert result == 98765
 
-    @patch('app.api.canvas_api.requests.post')
-    def test_create_calendar_event_personal(self, mock_post):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_create_calendar_event_personal(self, mock_request, make_response):
         """Test creating a personal calendar event (no course)."""
-        mock_response = Mock()
-        mock_response.json.return_value = {**self.sample_canvas_event_response, "context_code": "user_54321"}
-        mock_response.status_code = 201
-        mock_response.raise_for_status.return_value = None
-        mock_post.return_value = mock_response
+        mock_request.return_value = make_response({**self.sample_canvas_event_response, "context_code": "user_54321"}, status_code=201)
         
         # Test data without course_id (personal event)
         personal_event_data = {
@@ -336,22 +346,23 @@ class TestCanvasAPIEventCreation:
             **personal_event_data
         )
         
-        # Verify the payload doesn't include context_code for personal events
-        call_args = mock_post.call_args
-        payload = json.loads(call_args[1]['data'])
-        
         # Personal events should not have context_code in the request
-        assert 'context_code' not in payload['calendar_event']
-        assert payload['calendar_event']['title'] == 'Personal Reminder'
+        call_args = mock_request.call_args
+        expected_payload = {
+            'calendar_event': {
+                'title': 'Personal Reminder',
+                'start_at': '2024-12-25T10:00:00Z',
+                'description': 'Don\'t forget to call mom'
+            }
+        }
+        assert call_args[1]['data'] == canvas_api._json_dumps(expected_payload)
 
-    @patch('app.api.canvas_api.requests.post')
-    def test_create_calendar_event_api_error(self, mock_post):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_create_calendar_event_api_error(self, mock_request, make_response):
         """Test handling of Canvas API errors during event creation."""
-        mock_response = Mock()
-        mock_response.status_code = 400
-        mock_response.json.return_value = {"errors": [{"message": "Invalid date format"}]}
-        mock_response.raise_for_status.side_effect = Exception("Bad Request")
-        mock_post.return_value = mock_response
+        mock_request.return_value = make_response(
+            {"errors": [{"message": "Invalid date format"}]}, status_code=400
+        )
         
         # Should raise CanvasAPIError
         with pytest.raises(CanvasAPIError) as exc_info:
@@ -367,34 +378,28 @@ class TestCanvasAPIEventCreation:
 class TestCanvasAPIErrorHandling:
     """Test suite for Canvas API error handling."""
     
-    @patch('app.api.canvas_api.requests.get')
-    def test_get_assignments_api_error(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_get_assignments_api_error(self, mock_request, make_response):
         """Test handling of API errors in get_assignments."""
-        mock_response = Mock()
-        mock_response.status_code = 401
-        mock_response.raise_for_status.side_effect = Exception("Unauthorized")
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response({"errors": [{"message": "Unauthorized"}]}, status_code=401)
         
         with pytest.raises(CanvasAPIError) as exc_info:
             get_assignments("invalid_token", "fake_base_url")
         
         assert "Canvas API error" in str(exc_info.value)
 
-    @patch('app.api.canvas_api.requests.get')
-    def test_get_courses_api_error(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_get_courses_api_error(self, mock_request, make_response):
         """Test handling of API errors in get_courses."""
-        mock_response = Mock()
-        mock_response.status_code = 500
-        mock_response.raise_for_status.side_effect = Exception("Internal Server Error")
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response({"errors": [{"message": "Internal Server Error"}]}, status_code=500)
         
         with pytest.raises(CanvasAPIError):
             get_courses("fake_token", "fake_base_url")
 
-    @patch('app.api.canvas_api.requests.get')
-    def test_network_error_handling(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_network_error_handling(self, mock_request):
         """Test handling of network errors."""
-        mock_get.side_effect = Exception("Connection timeout")
+        mock_request.side_effect = requests.exceptions.ConnectionError("Connection timeout")
         
         with pytest.raises(CanvasAPIError) as exc_info:
             get_assignments("fake_token", "fake_base_url")
@@ -405,21 +410,17 @@ class TestCanvasAPIErrorHandling:
 class TestCanvasAPIEdgeCases:
     """Test suite for edge cases and data validation."""
     
-    @patch('app.api.canvas_api.requests.get')
-    def test_empty_assignments_response(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_empty_assignments_response(self, mock_request, make_response):
         """Test handling of empty assignments response."""
-        mock_response = Mock()
-        mock_response.json.return_value = []
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response([])
         
         result = get_assignments("fake_token", "fake_base_url")
         
         assert result == []
 
-    @patch('app.api.canvas_api.requests.get')
-    def test_malformed_date_handling(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_malformed_date_handling(self, mock_request, make_response):
         """Test handling of malformed date strings in Canvas response."""
         malformed_assignment = {
             "id": 12345,
@@ -435,18 +436,14 @@ class TestCanvasAPIEdgeCases:
             "lock_at": None
         }
         
-        mock_response = Mock()
-        mock_response.json.return_value = [malformed_assignment]
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response([malformed_assignment])
         
         # Should handle malformed dates gracefully by excluding the assignment
         result = get_assignments("fake_token", "fake_base_url")
         assert result == []
 
-    @patch('app.api.canvas_api.requests.get')
-    def test_missing_required_fields(self, mock_get):
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_missing_required_fields(self, mock_request, make_response):
         """Test handling of assignments with missing required fields."""
         incomplete_assignment = {
             "id": 12345,
@@ -454,16 +451,89 @@ class TestCanvasAPIEdgeCases:
             # Missing due_at, course_id, etc.
         }
         
-        mock_response = Mock()
-        mock_response.json.return_value = [incomplete_assignment]
-        mock_response.status_code = 200
-        mock_response.raise_for_status.return_value = None
-        mock_get.return_value = mock_response
+        mock_request.return_value = make_response([incomplete_assignment])
         
         # Should handle missing fields gracefully
         result = get_assignments("fake_token", "fake_base_url")
         assert result == []
 
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_course_with_null_term(self, mock_request, make_response):
+        """Test that a course whose term is null parses with an empty term name."""
+        course = {"id": 1001, "name": "Calculus I", "course_code": "MATH101",
+                  "workflow_state": "available", "term": None}
+        mock_request.return_value = make_response([course])
+        
+        result = canvas_api.get_courses("fake_token")
+        
+        assert [c["term"] for c in result] == [""]
+    
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_unexpected_payload_shape_raises_canvas_error(self, mock_request, make_response):
+        """Test that a payload of the wrong shape surfaces as CanvasAPIError."""
+        mock_request.return_value = make_response(["not-a-course"])
+        
+        with pytest.raises(CanvasAPIError):
+            canvas_api.get_courses("fake_token")
+
+
+class TestCanvasAPIConditionalFetch:
+    """Test suite for the ETag-based conditional fetchers."""
+    
+    COURSE = {"id": 1001, "name": "Calculus I", "course_code": "MATH101", "workflow_state": "available"}
+    NEXT_LINK = {"next": {"url": "https://canvas.university.edu/api/v1/courses?page=bookmark:abc"}}
+    
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_multi_page_courses_return_no_etag(self, mock_request, make_response):
+        """Test that an ETag is not kept when the course list spans several pages."""
+        first = make_response([self.COURSE])
+        first.links = self.NEXT_LINK
+        first.headers = {"ETag": "v1"}
+        mock_request.side_effect = [first, make_response([])]
+        
+        courses, etag = canvas_api.get_courses_if_changed("fake_token")
+        
+        assert [course["id"] for course in courses] == [1001]
+        assert etag is None
+    
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_304_with_next_page_refetches_courses(self, mock_request, make_response):
+        """Test that a 304 is not trusted when the listing has more pages."""
+        not_modified = make_response([], status_code=304)
+        not_modified.links = self.NEXT_LINK
+        refreshed = make_response([self.COURSE])
+        refreshed.headers = {"ETag": "v2"}
+        mock_request.side_effect = [not_modified, refreshed]
+        
+        courses, etag = canvas_api.get_courses_if_changed("fake_token", "v1")
+        
+        assert courses is not canvas_api.UNCHANGED
+        assert [course["id"] for course in courses] == [1001]
+        assert etag == "v2"
+        assert "If-None-Match" not in mock_request.call_args_list[1][1]['headers']
+    
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_single_page_304_is_unchanged(self, mock_request, make_response):
+        """Test that a 304 for a one-page listing reports UNCHANGED."""
+        mock_request.return_value = make_response([], status_code=304)
+        
+        courses, etag = canvas_api.get_courses_if_changed("fake_token", "v1")
+        
+        assert courses is canvas_api.UNCHANGED
+        assert etag == "v1"
+    
+    @patch('app.api.canvas_api._SESSION.request')
+    def test_assignments_if_changed_skips_course_cache(self, mock_request, make_response):
+        """Test that a stale cached course list cannot hide a new course."""
+        canvas_api._COURSES_CACHE.set(("fake_token", canvas_api.CANVAS_API_BASE), [])
+        mock_request.side_effect = [make_response([self.COURSE]), make_response([])]
+        
+        assignments, etags = canvas_api.get_assignments_if_changed("fake_token", {})
+        
+        assert assignments == []
+        urls = [call[1]['url'] for call in mock_request.call_args_list]
+        assert urls[0].endswith("/api/v1/courses")
+        assert urls[1].endswith("/api/v1/courses/1001/assignments")
 
 if __name__ == "__main__":
     # This allows running the tests directly with: python test_canvas_api.py
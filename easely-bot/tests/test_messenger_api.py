@@ -0,0 +1,114 @@
+"""
+Test suite for the Messenger API module.
+
+These tests cover the Graph API batch sender without making HTTP requests;
+the shared session's post method is mocked to return canned batch responses.
+"""
+
+import pytest
+from unittest.mock import patch
+from types import SimpleNamespace
+import json
+
+import requests
+
+from app.api import messenger_api
+from app.api.messenger_api import send_text_messages_batch, MESSENGER_BATCH_SIZE
+
+
+def make_batch_response(entries, status_code=200):
+    """Build a Graph API batch response holding the given per-request entries."""
+    return SimpleNamespace(
+        status_code=status_code,
+        text=json.dumps(entries),
+        json=lambda: entries
+    )
+
+
+def ok_for_every_request(url, data, timeout):
+    """Answer a batch POST with a 200 entry for each request it carries."""
+    return make_batch_response([{"code": 200, "body": "{}"}] * len(json.loads(data["batch"])))
+
+
+@pytest.fixture(autouse=True)
+def messenger_token():
+    """Provide a page access token without loading the real settings."""
+    with patch.object(messenger_api, "get_settings",
+                      return_value=SimpleNamespace(messenger_access_token="page-token")):
+        yield
+
+
+@pytest.fixture
+def mock_post():
+    """Mock the shared session's post method."""
+    with patch.object(messenger_api._SESSION, "post") as post:
+        yield post
+
+
+def items(count):
+    """Build count (user_id, text) pairs."""
+    return [(f"psid-{i}", f"message {i}") for i in range(count)]
+
+
+class TestSendTextMessagesBatch:
+    """Test suite for sending text messages through the batch endpoint."""
+    
+    def test_chunks_at_batch_size(self, mock_post):
+        """Test that items are split into batches of MESSENGER_BATCH_SIZE."""
+        mock_post.side_effect = ok_for_every_request
+        
+        results = send_text_messages_batch(items(2 * MESSENGER_BATCH_SIZE + 20))
+        
+        sizes = [len(json.loads(call.kwargs["data"]["batch"])) for call in mock_post.call_args_list]
+        assert sizes == [MESSENGER_BATCH_SIZE, MESSENGER_BATCH_SIZE, 20]
+        assert results == [True] * (2 * MESSENGER_BATCH_SIZE + 20)
+    
+    def test_batch_entries_address_each_recipient(self, mock_post):
+        """Test that each batch entry posts to me/messages for its own recipient."""
+        mock_post.side_effect = ok_for_every_request
+        
+        send_text_messages_batch([("psid-7", "hello")])
+        
+        data = mock_post.call_args.kwargs["data"]
+        assert data["access_token"] == "page-token"
+        entry = json.loads(data["batch"])[0]
+        assert entry["relative_url"] == "me/messages"
+        assert "psid-7" in entry["body"] and "hello" in entry["body"]
+    
+    def test_failed_and_null_entries_are_false(self, mock_post):
+        """Test that a non-200 entry code and a null entry both count as failures."""
+        mock_post.return_value = make_batch_response([
+            {"code": 200, "body": "{}"},
+            {"code": 400, "body": '{"error": {"code": 551}}'},
+            None
+        ])
+        
+        assert send_text_messages_batch(items(3)) == [True, False, False]
+    
+    def test_short_response_is_padded(self, mock_post):
+        """Test that items missing from a short response are reported as failed."""
+        mock_post.return_value = make_batch_response([{"code": 200, "body": "{}"}])
+        
+        assert send_text_messages_batch(items(3)) == [True, False, False]
+    
+    def test_non_200_response_fails_only_its_chunk(self, mock_post):
+        """Test that an HTTP error on the batch request fails every item in that chunk."""
+        mock_post.side_effect = [
+            make_batch_response({"error": "server"}, status_code=500),
+            make_batch_response([{"code": 200, "body": "{}"}] * 10)
+        ]
+        
+        results = send_text_messages_batch(items(MESSENGER_BATCH_SIZE + 10))
+        
+        assert results == [False] * MESSENGER_BATCH_SIZE + [True] * 10
+    
+    def test_request_exception_fails_whole_chunk(self, mock_post):
+        """Test that a network error fails every item in the chunk."""
+        mock_post.side_effect = requests.exceptions.ConnectionError("connection reset")
+        
+        assert send_text_messages_batch(items(3)) == [False, False, False]
+    
+    def test_empty_items_make_no_request(self, mock_post):
+        """Test that nothing is posted when there is nothing to send."""
+        assert send_text_messages_batch([]) == []
+        mock_post.assert_not_called()
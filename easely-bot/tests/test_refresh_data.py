@@ -0,0 +1,89 @@
+"""
+Test suite for the refresh_data job.
+
+These tests check how a user's Canvas assignments are turned into task rows
+and the statement that writes them; the database session is a mock, so no
+PostgreSQL server is needed.
+"""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.api.canvas_api import ParsedAssignment
+from app.database.queries import bulk_sync_canvas_tasks
+from app.jobs import refresh_data
+
+
+DUE = datetime(2024, 12, 5, 23, 59, tzinfo=timezone.utc)
+
+
+def make_assignment(assignment_id, course_id, title="Essay"):
+    """Build a ParsedAssignment for the given Canvas assignment and course."""
+    return ParsedAssignment(
+        canvas_assignment_id=assignment_id,
+        title=title,
+        due_date=DUE,
+        course_id=course_id,
+        course_name="Composition",
+        course_code="ENG101",
+        points_possible=10.0,
+        submission_types=["online_upload"],
+        html_url=None,
+        is_submitted=False
+    )
+
+
+class TestSyncUserAssignments:
+    """Test suite for building a user's assignment diff."""
+    
+    def test_new_tasks_carry_local_course_id(self):
+        """Test that inserted rows reference our Course.id, not the Canvas course ID."""
+        user = SimpleNamespace(id=7)
+        assignments = [make_assignment(101, 55), make_assignment(102, 99)]
+        
+        with patch.object(refresh_data, "bulk_sync_canvas_tasks", return_value=(2, 0, 0)) as bulk_sync:
+            refresh_data.sync_user_assignments(MagicMock(), user, assignments, [], {"55": 3})
+        
+        to_insert = bulk_sync.call_args.args[2]
+        assert {row["canvas_assignment_id"]: row["course_id"] for row in to_insert} == {
+            "101": 3,
+            "102": None
+        }
+
+
+class TestBulkSyncCanvasTasks:
+    """Test suite for the statement that writes new Canvas tasks."""
+    
+    def _insert_sql(self, to_insert):
+        """Run bulk_sync_canvas_tasks on a mock session and compile its INSERT."""
+        session = MagicMock()
+        bulk_sync_canvas_tasks(session, 7, to_insert, [], [])
+        
+        stmt = session.execute.call_args_list[0].args[0]
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        return str(compiled), compiled.params
+    
+    def test_insert_includes_course_id(self):
+        """Test that each inserted row sets course_id."""
+        sql, params = self._insert_sql([
+            {"canvas_assignment_id": "101", "course_id": 3, "title": "Essay", "due_date": DUE}
+        ])
+        
+        assert "course_id" in sql.split("ON CONFLICT")[0]
+        assert 3 in params.values()
+    
+    def test_reappearing_assignment_is_restored(self):
+        """Test that a conflict with a soft-deleted task undeletes and refreshes it."""
+        sql, params = self._insert_sql([
+            {"canvas_assignment_id": "101", "course_id": 3, "title": "Essay v2", "due_date": DUE}
+        ])
+        
+        conflict = sql.split("ON CONFLICT")[1]
+        assert "(user_id, canvas_assignment_id) DO UPDATE" in conflict
+        assert "is_deleted =" in conflict
+        assert False in params.values()
+        for column in ("title", "due_date", "course_id"):
+            assert f"{column} = excluded.{column}" in conflict
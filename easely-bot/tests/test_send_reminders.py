@@ -0,0 +1,214 @@
+"""
+Test suite for the send_reminders job.
+
+These tests cover the helpers that match, format and digest reminders, and
+the send pipeline in process_reminders with its database queries and the
+Messenger client mocked out.
+"""
+
+import pytest
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.database.models import SubscriptionTier
+from app.jobs import send_reminders
+from app.jobs.send_reminders import (
+    create_digest_message,
+    create_reminder_message,
+    format_due_date,
+    match_reminders_in_python,
+    process_reminders,
+    FREE_TIER_WINDOWS,
+    PREMIUM_TIER_WINDOWS,
+    WINDOW_LOOKUP
+)
+
+
+NOW = datetime(2024, 12, 5, 12, 0, tzinfo=timezone.utc)
+PREMIUM = WINDOW_LOOKUP[SubscriptionTier.PREMIUM]
+
+
+def make_task(task_id, due_date, tier=SubscriptionTier.PREMIUM, messenger_id="psid-1", **flags):
+    """Build a task with its user loaded, as the reminder queries return it."""
+    user = SimpleNamespace(id=hash(messenger_id), messenger_id=messenger_id, subscription_tier=tier)
+    return SimpleNamespace(
+        id=task_id,
+        title=f"Task {task_id}",
+        due_date=due_date,
+        user=user,
+        user_id=user.id,
+        course_name=None,
+        **flags
+    )
+
+
+class TestFormatDueDate:
+    """Test suite for due date formatting in reminder messages."""
+    
+    def test_matches_strftime_across_hours_and_months(self):
+        """Test that formatting matches the previous strftime output."""
+        start = datetime(2024, 1, 1, 0, 0, tzinfo=timezone.utc)
+        
+        # Step through a leap year in 7-hour steps with varying minutes
+        for offset in range(0, 366 * 24, 7):
+            due_date = start + timedelta(hours=offset, minutes=offset % 60)
+            expected = due_date.strftime("%B %d, %Y at %I:%M %p UTC")
+            assert format_due_date(due_date) == expected
+    
+    @pytest.mark.parametrize("hour,expected_clock", [
+        (0, "12:05 AM"),
+        (11, "11:05 AM"),
+        (12, "12:05 PM"),
+        (23, "11:05 PM"),
+    ])
+    def test_midnight_and_noon_boundaries(self, hour, expected_clock):
+        """Test the 12-hour clock around midnight and noon."""
+        due_date = datetime(2024, 12, 5, hour, 5, tzinfo=timezone.utc)
+        
+        assert format_due_date(due_date) == f"December 05, 2024 at {expected_clock} UTC"
+    
+    def test_naive_datetime_treated_as_utc(self):
+        """Test that naive datetimes are formatted as UTC."""
+        naive = datetime(2024, 3, 9, 14, 30)
+        
+        assert format_due_date(naive) == "March 09, 2024 at 02:30 PM UTC"
+
+
+class TestReminderTemplates:
+    """Test suite for the reminder window message templates."""
+    
+    @pytest.mark.parametrize("window", FREE_TIER_WINDOWS + PREMIUM_TIER_WINDOWS,
+                             ids=lambda window: window.name)
+    def test_templates_contain_no_mojibake(self, window):
+        """Test that emoji survive as real code points, not cp1252-decoded bytes."""
+        for text in (window.message_template, window.emoji):
+            # UTF-8 emoji bytes misread as cp1252 start with these characters
+            assert "\u00f0" not in text
+            assert "\u00e2" not in text
+    
+    def test_template_starts_with_window_emoji(self):
+        """Test that each template leads with its window's emoji."""
+        assert FREE_TIER_WINDOWS[0].emoji == "\U0001F514"
+        
+        for window in FREE_TIER_WINDOWS + PREMIUM_TIER_WINDOWS:
+            assert window.message_template.startswith(window.emoji)
+
+
+class TestCreateDigestMessage:
+    """Test suite for combining a user's reminders into one message."""
+    
+    def test_single_reminder_uses_window_message(self):
+        """Test that one reminder is sent with its full window template."""
+        task = make_task(1, NOW + timedelta(hours=24))
+        
+        message = create_digest_message([(task, PREMIUM["1_day"])])
+        
+        assert message == create_reminder_message(task, PREMIUM["1_day"])
+        assert message.startswith(PREMIUM["1_day"].emoji)
+    
+    def test_multiple_reminders_listed_most_urgent_first(self):
+        """Test that a digest has a count header and orders tasks by urgency."""
+        week = make_task(1, NOW + timedelta(hours=168))
+        hour = make_task(2, NOW + timedelta(hours=1))
+        day = make_task(3, NOW + timedelta(hours=24))
+        
+        message = create_digest_message([
+            (week, PREMIUM["1_week"]),
+            (hour, PREMIUM["1_hour"]),
+            (day, PREMIUM["1_day"])
+        ])
+        
+        header, *lines = message.split("\n\n")
+        assert header == "📋 You have 3 upcoming deadlines:"
+        assert lines == [
+            f"{PREMIUM['1_hour'].emoji} 'Task 2' - due {format_due_date(hour.due_date)}",
+            f"{PREMIUM['1_day'].emoji} 'Task 3' - due {format_due_date(day.due_date)}",
+            f"{PREMIUM['1_week'].emoji} 'Task 1' - due {format_due_date(week.due_date)}"
+        ]
+
+
+class TestMatchRemindersInPython:
+    """Test suite for the Python fallback reminder matcher."""
+    
+    @pytest.mark.parametrize("offset,matched", [
+        (timedelta(minutes=-30), True),
+        (timedelta(minutes=30), True),
+        (timedelta(minutes=-30, seconds=-1), False),
+        (timedelta(minutes=30, seconds=1), False),
+    ])
+    def test_tolerance_edges_are_inclusive(self, offset, matched):
+        """Test that a due date exactly at either tolerance edge still matches."""
+        task = make_task(1, NOW + timedelta(hours=24) + offset)
+        
+        matches = match_reminders_in_python([task], NOW)
+        
+        assert ((task, "1_day") in matches) is matched
+    
+    def test_windows_follow_subscription_tier(self):
+        """Test that free users only get the free tier windows."""
+        free = make_task(1, NOW + timedelta(hours=168), tier=SubscriptionTier.FREE)
+        premium = make_task(2, NOW + timedelta(hours=168))
+        
+        assert match_reminders_in_python([free, premium], NOW) == [(premium, "1_week")]
+    
+    def test_already_sent_window_skipped(self):
+        """Test that a task whose window flag is set is not matched again."""
+        task = make_task(1, NOW + timedelta(hours=8), reminder_8_hours_sent=True)
+        
+        assert match_reminders_in_python([task], NOW) == []
+
+
+class TestProcessReminders:
+    """Test suite for the claim, send and release pipeline."""
+    
+    def test_failed_sends_release_their_claims(self):
+        """Test that only failed digests give their claims back for a retry."""
+        first = make_task(1, NOW + timedelta(hours=24), messenger_id="psid-ok")
+        second = make_task(2, NOW + timedelta(hours=8), messenger_id="psid-ok")
+        third = make_task(3, NOW + timedelta(hours=24), messenger_id="psid-fail")
+        claim_ids = {(1, "1_day"): 101, (2, "8_hours"): 102, (3, "1_day"): 103}
+        
+        mocks = {
+            "get_session_factory": MagicMock(return_value=MagicMock(return_value=MagicMock())),
+            "get_reminder_matches": MagicMock(return_value=[
+                (first, "1_day"), (second, "8_hours"), (third, "1_day")
+            ]),
+            "claim_reminders": MagicMock(return_value=claim_ids),
+            "send_text_message": MagicMock(side_effect=lambda messenger_id, text: messenger_id == "psid-ok"),
+            "bulk_mark_reminders_sent": MagicMock(),
+            "release_reminder_claims": MagicMock(),
+            "count_users_with_reminder_claims": MagicMock(return_value=1)
+        }
+        
+        with patch.multiple(send_reminders, **mocks):
+            stats = process_reminders()
+        
+        mocks["release_reminder_claims"].assert_called_once()
+        assert mocks["release_reminder_claims"].call_args.args[1] == [103]
+        assert mocks["bulk_mark_reminders_sent"].call_args.args[1] == {"1_day": [1], "8_hours": [2]}
+        assert mocks["send_text_message"].call_count == 2
+        assert sorted(mocks["count_users_with_reminder_claims"].call_args.args[1]) == [101, 102]
+        assert (stats.messages_sent, stats.reminders_sent, stats.reminders_failed) == (1, 2, 1)
+    
+    def test_unclaimed_reminders_not_sent(self):
+        """Test that reminders another run already claimed are skipped."""
+        task = make_task(1, NOW + timedelta(hours=24))
+        
+        mocks = {
+            "get_session_factory": MagicMock(return_value=MagicMock(return_value=MagicMock())),
+            "get_reminder_matches": MagicMock(return_value=[(task, "1_day")]),
+            "claim_reminders": MagicMock(return_value={}),
+            "send_text_message": MagicMock(return_value=True),
+            "bulk_mark_reminders_sent": MagicMock(),
+            "release_reminder_claims": MagicMock(),
+            "count_users_with_reminder_claims": MagicMock(return_value=0)
+        }
+        
+        with patch.multiple(send_reminders, **mocks):
+            stats = process_reminders()
+        
+        mocks["send_text_message"].assert_not_called()
+        mocks["release_reminder_claims"].assert_called_once()
+        assert mocks["release_reminder_claims"].call_args.args[1] == []
+        assert stats.reminders_sent == 0